@@ -12,22 +12,53 @@ Uso:
 
 import argparse
 import asyncio
-import base64
+import atexit
+import binascii
+import bisect
 import copy
-import json
+import functools
+import hashlib
+import itertools
 import logging
+import mmap
+import os
+import posixpath
+import queue
 import re
 import shutil
+import sqlite3
+import stat
+import struct
 import sys
 import tempfile
+import threading
 import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from enum import IntEnum
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple
 
-from bs4 import BeautifulSoup
-from deep_translator import GoogleTranslator
+import orjson
 from lxml import etree
+from lxml import html as lhtml
+
+try:
+    import pybase64  # Opcional: base64 vectorizado (SIMD) para blobs Rise grandes
+except ImportError:
+    pybase64 = None
+
+try:
+    # Opcional: event loop sobre libuv (uvloop en Linux/macOS, winloop en Windows)
+    if sys.platform == 'win32':
+        import winloop as uvloop
+    else:
+        import uvloop
+except ImportError:
+    uvloop = None
 
 # ============================================================================
 # CONSTANTES DE FLUJO BATCH
@@ -37,6 +68,106 @@ SCRIPT_DIR = Path(__file__).parent
 PENDING_DIR = SCRIPT_DIR / "pendientes"
 PROCESSED_DIR = SCRIPT_DIR / "procesados"
 TRANSLATED_DIR = SCRIPT_DIR / "traducidos"
+# Idiomas ya reconstruidos por paquete pendiente (reanudación del modo batch)
+BATCH_STATE_FILE = SCRIPT_DIR / "state.json"
+
+# ============================================================================
+# CONSTANTES DE CONCURRENCIA
+# ============================================================================
+
+# Idiomas procesados en paralelo (acota la concurrencia contra Google Translate)
+MAX_PARALLEL_LANGUAGES = 4
+
+# Peticiones en vuelo por idioma y peticiones por segundo a Google Translate
+MAX_PARALLEL_REQUESTS = 16
+MAX_REQUESTS_PER_SECOND = 20
+
+# Tamaño descomprimido máximo de un paquete (configurable con --max-zip-size)
+MAX_UNCOMPRESSED_SIZE = 2 * 1024 ** 3
+
+# Memoria de traducción persistente por defecto (configurable con --tm-cache)
+DEFAULT_TM_PATH = Path.home() / '.cache' / 'traductor-scorm' / 'tm.db'
+
+# Tiempo máximo (s) de cada petición HTTP a Google Translate
+HTTP_TIMEOUT = 120
+
+# Directorio en RAM (tmpfs) preferido para la extracción temporal en Linux
+SHM_DIR = '/dev/shm'
+
+# Tamaño de los bloques al copiar entradas del ZIP a disco durante la extracción
+COPY_BUFFER_SIZE = 64 * 1024
+
+# Borrado de directorios temporales en segundo plano (fuera del camino crítico)
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cleanup')
+
+# Directorio `scorm_arena_*` del proceso por raíz temporal; cada paquete
+# trabaja en un subdirectorio `job_N` (ver `_make_temp_dir`)
+_SCRATCH_ARENAS: dict[Optional[str], Path] = {}
+_SCRATCH_ARENAS_LOCK = threading.Lock()  # `_make_temp_dir` se llama desde hilos
+_JOB_IDS = itertools.count()
+
+# ============================================================================
+# EXPRESIONES REGULARES
+# ============================================================================
+
+# Compiladas una vez a nivel de módulo (usadas en bucles de extracción)
+_RE_WHITESPACE = re.compile(r'\s+')
+
+# Payload base64 de Articulate Rise: deserialize("...") (sobre bytes)
+_RE_DESERIALIZE = re.compile(rb'deserialize\("([A-Za-z0-9+/=]+)"\)')
+
+# Elemento <title> del manifest (texto plano, sin atributos)
+_RE_MANIFEST_TITLE = re.compile(rb'<title>([^<]*)</title>')
+
+# Texto no traducible, en un único `match` (una sola pasada en C): esquema
+# URL al inicio, ID hexadecimal/UUID, color hex o solo números/puntuación
+_RE_NON_TEXT = re.compile(
+    r'(?:https?://|//|mailto:)'
+    r'|[0-9a-fA-F-]{32,}\Z'
+    r'|#[0-9a-fA-F]{3,8}\Z'
+    r'|[\d.,\s]+\Z'
+)
+
+# Secuencias de dígitos: deben sobrevivir a la traducción (comprobación de lotes)
+_RE_DIGITS = re.compile(r'\d+')
+
+# Prefijo de unidad de Windows (`C:`) al inicio de una ruta del ZIP
+_RE_DRIVE_PREFIX = re.compile(r'[A-Za-z]:')
+
+# Código de idioma: idioma ISO 639 y subetiqueta opcional (en, pt-BR, zh-CN, mni-Mtei)
+_RE_LANG_CODE = re.compile(r'([a-z]{2,3})(?:-([a-z0-9]{2,8}))?', re.IGNORECASE)
+
+# Escape XML de texto en una sola pasada (`str.translate`)
+_XML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# ============================================================================
+# PARSERS XML/HTML (libxml2)
+# ============================================================================
+
+# Parser del manifest: sin tabla de IDs (no se usa) y sin entidades externas
+# ni red. `huge_tree` se deja desactivado a propósito: el ZIP no es de
+# confianza y los límites de libxml2 protegen frente a abusos.
+_XML_PARSER = etree.XMLParser(collect_ids=False, resolve_entities=False, no_network=True)
+
+# Parser HTML; UTF-8 explícito como el decode previo del original
+_HTML_PARSER = lhtml.HTMLParser(encoding='utf-8')
+
+# ============================================================================
+# CODIFICACIÓN BASE64
+# ============================================================================
+
+def _b64decode(data: bytes) -> bytes:
+    """Decodificar base64 sin validar (pybase64 si está instalado)."""
+    if pybase64 is not None:
+        return pybase64.b64decode(data, validate=False)
+    return binascii.a2b_base64(data)
+
+
+def _b64encode(data: bytes) -> bytes:
+    """Codificar a base64 sin salto de línea final (pybase64 si está instalado)."""
+    if pybase64 is not None:
+        return pybase64.b64encode(data)
+    return binascii.b2a_base64(data, newline=False)
 
 # ============================================================================
 # LOGGING ESTRUCTURADO
@@ -65,8 +196,16 @@ class JsonFormatter(logging.Formatter):
         return log_data
 
     def _serialize_to_json(self, log_dict: dict) -> str:
-        """Serializar diccionario a JSON."""
-        return json.dumps(log_dict, ensure_ascii=False)
+        """Serializar diccionario a JSON (orjson; `str` para valores no serializables)."""
+        return orjson.dumps(log_dict, default=str).decode()
+
+
+class _RecordQueueHandler(QueueHandler):
+    """Encola el LogRecord sin formatear: el JSON se genera en el hilo del listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -74,6 +213,35 @@ handler = logging.StreamHandler(sys.stdout)
 handler.setFormatter(JsonFormatter())
 logger.addHandler(handler)
 
+
+@contextmanager
+def _queued_logging() -> Iterator[None]:
+    """Formatear y escribir los logs en un hilo aparte mientras dura el bloque.
+
+    El event loop solo encola el record; al salir se vacía la cola y se
+    restaura el handler directo.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(log_queue)
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    try:
+        yield
+    finally:
+        logger.removeHandler(queue_handler)
+        logger.addHandler(handler)
+        listener.stop()
+
+
+def _use_direct_logging() -> None:
+    """Escribir los logs directamente (procesos hijos: con `fork` heredan el
+    QueueHandler pero no el hilo del listener)."""
+    for current in list(logger.handlers):
+        logger.removeHandler(current)
+    logger.addHandler(handler)
+
 # ============================================================================
 # MODELOS DE DATOS
 # ============================================================================
@@ -85,6 +253,8 @@ class Segment:
     text: str
     path: str  # XPath o JSON path
     is_html: bool = False
+    offset: int = -1  # Offset en bytes del texto en el archivo original (-1: no localizado)
+    json_keys: Tuple[Any, ...] = ()  # Claves/índices hasta el valor en el JSON de Rise
 
 
 @dataclass
@@ -103,6 +273,7 @@ class ExtractionResult:
     """Resultado de extracción de contenido."""
     segments: List[Segment] = field(default_factory=list)
     files: Dict[str, List[Segment]] = field(default_factory=dict)
+    rise_files: set[str] = field(default_factory=set)  # Claves de `files` que son cursos Rise
 
 
 # ============================================================================
@@ -117,9 +288,20 @@ class ScormParser:
         'adlcp': 'http://www.adlnet.org/xsd/adlcp_rootv1p2',
         'imsmd': 'http://www.imsglobal.org/xsd/imsmd_rootv1p2p1',
     }
+
+    # Únicos ficheros que se extraen a disco (junto al manifest): el resto
+    # (medios, JS, CSS) se copia directamente del ZIP original al reconstruir
+    EXTRACT_SUFFIXES = ('.html', '.htm')
+
+    # Ratio descompresión/compresión a partir del cual una entrada se trata
+    # como bomba. Solo se evalúa en entradas grandes: un HTML pequeño y muy
+    # repetitivo puede superar 100:1 sin ningún riesgo
+    MAX_COMPRESSION_RATIO = 100
+    RATIO_MIN_SIZE = 1024 * 1024
     
-    def __init__(self, temp_dir: Optional[Path] = None):
+    def __init__(self, temp_dir: Optional[Path] = None, max_uncompressed_size: int = MAX_UNCOMPRESSED_SIZE):
         self.temp_dir = temp_dir or Path(tempfile.mkdtemp())
+        self.max_uncompressed_size = max_uncompressed_size
     
     def parse(self, zip_path: Path) -> ScormPackage:
         """Parsear un paquete SCORM."""
@@ -127,7 +309,7 @@ class ScormParser:
         manifest_path = self._extract_zip(zip_path, extract_path)
 
         scorm_root = (extract_path / manifest_path).parent
-        tree = etree.parse(str(extract_path / manifest_path))
+        tree = etree.parse(str(extract_path / manifest_path), _XML_PARSER)
         root = tree.getroot()
 
         # Extraer directorio raíz del manifest path (ej: "curso/imsmanifest.xml" -> "curso")
@@ -143,33 +325,104 @@ class ScormParser:
         )
 
     def _extract_zip(self, zip_path: Path, extract_path: Path) -> str:
-        """Extraer ZIP y retornar ruta al manifest.
+        """Extraer del ZIP el manifest y los HTML, y retornar ruta al manifest.
 
         Returns:
             Ruta relativa del imsmanifest.xml dentro del ZIP.
 
         Raises:
-            ValueError: Si no encuentra manifest.
+            ValueError: Si no encuentra manifest o el ZIP no supera las comprobaciones de seguridad.
         """
         import unicodedata
         extract_path.mkdir(parents=True, exist_ok=True)
 
         with zipfile.ZipFile(zip_path, 'r') as z:
+            # Solo metadatos del directorio central: se rechaza antes de descomprimir nada
+            self._check_zip_safety(z.infolist())
             manifest_path = self._find_manifest(z.namelist())
             if not manifest_path:
                 raise ValueError("No se encontró imsmanifest.xml")
 
-            for member in z.namelist():
-                if not member.startswith('__MACOSX'):
+            for info in z.infolist():
+                member = info.filename
+                if self._is_symlink(info):
+                    logger.warning("Skipping symlink entry", extra={"member": member})
+                elif self._needs_extraction(info, manifest_path):
                     normalized = self._fix_corrupted_unicode(member)
-                    target_path = extract_path / normalized
+                    target_path = self._safe_target(extract_path, normalized)
                     target_path.parent.mkdir(parents=True, exist_ok=True)
-                    if not member.endswith('/'):
-                        with z.open(member) as src, open(target_path, 'wb') as dst:
-                            dst.write(src.read())
+                    with z.open(member) as src, open(target_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
 
         return self._fix_corrupted_unicode(manifest_path)
 
+    @classmethod
+    def extracted_size(cls, zip_path: Path) -> int:
+        """Bytes que ocupará en disco la extracción de `zip_path` (solo directorio central)."""
+        with zipfile.ZipFile(zip_path, 'r') as z:
+            manifest_path = cls._find_manifest(z.namelist()) or ''
+            return sum(
+                info.file_size for info in z.infolist()
+                if cls._needs_extraction(info, manifest_path)
+            )
+
+    @classmethod
+    def _needs_extraction(cls, info: zipfile.ZipInfo, manifest_path: str) -> bool:
+        """Determinar si una entrada del ZIP puede contener texto traducible."""
+        member = info.filename
+        if member.startswith('__MACOSX'):
+            return False
+        if cls._is_symlink(info):
+            return False
+        return member == manifest_path or member.endswith(cls.EXTRACT_SUFFIXES)
+
+    @staticmethod
+    def _is_symlink(info: zipfile.ZipInfo) -> bool:
+        """Entrada guardada como enlace simbólico (modo Unix en `external_attr`)."""
+        return stat.S_ISLNK(info.external_attr >> 16)
+
+    def _check_zip_safety(self, infos: List[zipfile.ZipInfo]) -> None:
+        """Rechazar rutas que escapan del destino y bombas de descompresión.
+
+        Raises:
+            ValueError: Si una entrada es insegura o el total descomprimido excede el límite.
+        """
+        total = 0
+        for info in infos:
+            self._check_member_path(info.filename)
+            ratio_limit = self.MAX_COMPRESSION_RATIO * max(info.compress_size, 1)
+            if info.file_size >= self.RATIO_MIN_SIZE and info.file_size > ratio_limit:
+                raise ValueError(f"Ratio de compresión sospechoso en {info.filename}")
+            total += info.file_size
+            if total > self.max_uncompressed_size:
+                raise ValueError(
+                    f"El ZIP excede el tamaño descomprimido máximo ({self.max_uncompressed_size} bytes)"
+                )
+
+    def _check_member_path(self, member: str) -> None:
+        """Rechazar rutas absolutas, con `..` o con unidad (`C:`) que saldrían del directorio temporal.
+
+        Se normaliza siempre con `posixpath` (los nombres del ZIP usan `/`): con
+        `os.path` en Windows el separador resultante sería `\\`. Solo se rechaza
+        una letra de unidad: `:` es válido en carpetas ("Módulo 1: Intro") y
+        macOS guarda así la `/` de los nombres.
+        """
+        normalized = posixpath.normpath(member.replace('\\', '/'))
+        first = normalized.split('/', 1)[0]
+        if normalized.startswith('/') or first == '..' or _RE_DRIVE_PREFIX.match(first):
+            raise ValueError(f"Ruta insegura en el ZIP: {member}")
+
+    def _safe_target(self, extract_path: Path, name: str) -> Path:
+        """Ruta de destino de una entrada, comprobando que queda dentro de `extract_path`.
+
+        Raises:
+            ValueError: Si la ruta resuelta escapa del directorio de extracción.
+        """
+        target_path = (extract_path / name).resolve()
+        if not target_path.is_relative_to(extract_path.resolve()):
+            raise ValueError(f"Ruta insegura en el ZIP: {name}")
+        return target_path
+
     def _fix_corrupted_unicode(self, name: str) -> str:
         """Corregir nombres de archivo con Unicode corrupto (macOS NFD mal codificado)."""
         import unicodedata
@@ -184,7 +437,8 @@ class ScormParser:
             name = name.replace(bad, good)
         return unicodedata.normalize('NFC', name)
     
-    def _find_manifest(self, file_list: List[str]) -> Optional[str]:
+    @staticmethod
+    def _find_manifest(file_list: List[str]) -> Optional[str]:
         """Buscar imsmanifest.xml en el ZIP."""
         for name in file_list:
             if name.lower().endswith('imsmanifest.xml') and '__MACOSX' not in name:
@@ -209,15 +463,24 @@ class ScormParser:
         return None
     
     def _find_html_files(self, path: Path) -> List[str]:
-        """Encontrar archivos HTML en el paquete."""
-        html_files = []
-        for ext in ['*.html', '*.htm']:
-            html_files.extend(self._collect_files_by_ext(path, ext))
-        return sorted(html_files)
+        """Encontrar archivos HTML en el paquete (un único recorrido del árbol)."""
+        root = str(path)
+        return sorted(
+            os.path.relpath(file_path, root)
+            for file_path in self._walk_files(root)
+            if file_path.endswith(('.html', '.htm'))
+        )
 
-    def _collect_files_by_ext(self, path: Path, pattern: str) -> List[str]:
-        """Recopilar archivos por extensión."""
-        return [str(f.relative_to(path)) for f in path.rglob(pattern)]
+    def _walk_files(self, root: str) -> Iterator[str]:
+        """Recorrer ficheros con `os.scandir` (el tipo sale del dirent, sin `stat` extra)."""
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
 
 
 # ============================================================================
@@ -228,18 +491,23 @@ class ContentExtractor:
     """Extractor de contenido traducible de SCORM."""
     
     # Tags HTML con contenido traducible
-    TEXT_TAGS = {'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'div', 'li', 
-                 'td', 'th', 'label', 'button', 'a', 'option', 'title'}
+    TEXT_TAGS = frozenset({'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'span', 'div', 'li',
+                           'td', 'th', 'label', 'button', 'a', 'option', 'title'})
     
     # Tags a ignorar
-    SKIP_TAGS = {'script', 'style', 'code', 'pre', 'noscript'}
+    SKIP_TAGS = frozenset({'script', 'style', 'code', 'pre', 'noscript'})
     
     # Atributos traducibles
-    TRANSLATABLE_ATTRS = {'alt', 'title', 'placeholder', 'aria-label'}
+    TRANSLATABLE_ATTRS = frozenset({'alt', 'title', 'placeholder', 'aria-label'})
     
     # Campos de Articulate Rise
-    RISE_FIELDS = {'title', 'heading', 'paragraph', 'description', 'caption',
-                   'text', 'label', 'buttonText', 'question', 'answer', 'feedback'}
+    # En minúsculas: se comparan con `key.lower()` (coincidencia sin mayúsculas)
+    RISE_FIELDS = frozenset({'title', 'heading', 'paragraph', 'description', 'caption',
+                             'text', 'label', 'buttontext', 'question', 'answer', 'feedback'})
+
+    # Claves de Rise cuyo subárbol no contiene texto traducible
+    RISE_SKIP_KEYS = frozenset({'id', 'key', 'src', 'href', 'color', 'icon', 'media',
+                                'settings', 'background', 'exportSettings'})
     
     def extract(self, package: ScormPackage) -> ExtractionResult:
         """Extraer contenido traducible del paquete."""
@@ -256,7 +524,8 @@ class ContentExtractor:
             html_path = package.extracted_path / html_file
             
             # Verificar si es Articulate Rise
-            if self._is_rise_course(html_path):
+            is_rise = self._is_rise_course(html_path)
+            if is_rise:
                 segments = self._extract_rise(html_path, html_file)
             else:
                 segments = self._extract_html(html_path, html_file)
@@ -264,6 +533,8 @@ class ContentExtractor:
             if segments:
                 result.files[html_file] = segments
                 result.segments.extend(segments)
+                if is_rise:
+                    result.rise_files.add(html_file)
         
         return result
     
@@ -274,38 +545,39 @@ class ContentExtractor:
             return []
 
         segments = []
-        tree = etree.parse(str(manifest_path))
-
-        # Extraer títulos de organizaciones e items
-        for i, elem in enumerate(tree.iter()):
-            self._process_manifest_element(elem, i, tree, segments)
+        # Streaming: solo se notifican los <title> (filtrado por tag en libxml2),
+        # con las mismas protecciones que _XML_PARSER
+        titles = etree.iterparse(
+            str(manifest_path), events=('end',), tag='{*}title',
+            collect_ids=False, resolve_entities=False, no_network=True
+        )
+        for i, (_, elem) in enumerate(titles):
+            self._process_manifest_element(elem, i, segments)
+            elem.clear(keep_tail=True)
 
         return segments
 
-    def _process_manifest_element(self, elem, index: int, tree, segments: List[Segment]) -> None:
-        """Procesar un elemento del manifest para extracción."""
-        if not isinstance(elem.tag, str):
+    def _process_manifest_element(self, elem, index: int, segments: List[Segment]) -> None:
+        """Procesar un `<title>` del manifest para extracción."""
+        if not elem.text or not elem.text.strip():
             return
 
-        tag_name = elem.tag.split('}')[-1].lower() if '}' in elem.tag else elem.tag.lower()
+        text = elem.text.strip()
+        if len(text) >= 2:
+            parent = elem.getparent()
+            parent_tag = etree.QName(parent).localname if parent is not None else 'root'
+            parent_id = parent.get('identifier', str(index)) if parent is not None else str(index)
 
-        if tag_name == 'title' and elem.text and elem.text.strip():
-            text = elem.text.strip()
-            if len(text) >= 2:
-                parent = elem.getparent()
-                parent_tag = parent.tag.split('}')[-1] if parent is not None and isinstance(parent.tag, str) else 'root'
-                parent_id = parent.get('identifier', str(index)) if parent is not None else str(index)
-
-                seg_id = f"{parent_tag}_{parent_id}_title"
-                path = tree.getpath(elem)
-                segments.append(Segment(id=seg_id, text=text, path=path))
+            seg_id = f"{parent_tag}_{parent_id}_title"
+            # Clave sintética estable: el rebuild sustituye por texto, no por XPath
+            segments.append(Segment(id=seg_id, text=text, path=f"title[{index}]"))
     
     def _is_rise_course(self, html_path: Path) -> bool:
         """Verificar si es un curso Articulate Rise."""
         try:
-            with open(html_path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open(html_path, 'rb') as f:
                 content = f.read(5000)
-            return '__fetchCourse' in content and 'deserialize(' in content
+            return b'__fetchCourse' in content and b'deserialize(' in content
         except (IOError, OSError) as e:
             logger.debug(f"Cannot read HTML file: {html_path}", exc_info=True)
             return False
@@ -315,10 +587,10 @@ class ContentExtractor:
         segments = []
 
         try:
-            with open(html_path, 'r', encoding='utf-8', errors='ignore') as f:
+            with open(html_path, 'rb') as f:
                 content = f.read()
 
-            match = re.search(r'deserialize\("([A-Za-z0-9+/=]+)"\)', content)
+            match = _RE_DESERIALIZE.search(content)
             if not match:
                 return segments
 
@@ -333,39 +605,35 @@ class ContentExtractor:
 
         return segments
 
-    def _decode_rise_from_html(self, base64_str: str, rel_path: str) -> Optional[dict]:
+    def _decode_rise_from_html(self, base64_str: bytes, rel_path: str) -> Optional[dict]:
         """Decodificar JSON Rise desde base64."""
         try:
-            decoded = base64.b64decode(base64_str).decode('utf-8')
-            return json.loads(decoded)
-        except (base64.binascii.Error, json.JSONDecodeError) as e:
+            return orjson.loads(_b64decode(base64_str))
+        except (binascii.Error, orjson.JSONDecodeError) as e:
             logger.error(f"Invalid Rise JSON encoding in {rel_path}", exc_info=True)
             return None
     
-    def _extract_from_json(self, data: Any, path: str, segments: List[Segment]):
-        """Extraer recursivamente de JSON de Rise."""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                # Saltar campos no traducibles
-                if self._is_skippable_key(key):
-                    continue
-
-                new_path = f"{path}.{key}" if path else key
-
-                if isinstance(value, str) and len(value) >= 3:
-                    self._process_json_value(value, key, new_path, segments)
-                else:
-                    self._extract_from_json(value, new_path, segments)
-
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                self._extract_from_json(item, f"{path}[{i}]", segments)
-
-    def _is_skippable_key(self, key: str) -> bool:
-        """Determinar si una clave de JSON debe ignorarse (recursión)."""
-        skip_recursion = {'id', 'key', 'src', 'href', 'color', 'icon', 'media',
-                         'settings', 'background', 'exportSettings'}
-        return key in skip_recursion
+    def _extract_from_json(self, data: Any, path: str, segments: List[Segment], keys: Tuple[Any, ...] = ()):
+        """Extraer de JSON de Rise con una pila explícita (en orden de documento)."""
+        stack = [(data, path, keys)]
+        while stack:
+            node, node_path, node_keys = stack.pop()
+            if isinstance(node, dict):
+                children = [
+                    (value, f"{node_path}.{key}" if node_path else key, node_keys + (key,))
+                    for key, value in node.items() if key not in self.RISE_SKIP_KEYS
+                ]
+            elif isinstance(node, list):
+                children = [
+                    (item, f"{node_path}[{i}]", node_keys + (i,)) for i, item in enumerate(node)
+                ]
+            else:
+                # Solo los strings que cuelgan de una clave de objeto son candidatos
+                is_field = bool(node_keys) and isinstance(node_keys[-1], str)
+                if is_field and isinstance(node, str) and len(node) >= 3:
+                    self._process_json_value(node, node_keys[-1], node_path, segments, node_keys)
+                continue
+            stack.extend(reversed(children))
 
     def _is_translatable_key(self, key: str, path: str) -> bool:
         """Determinar si un campo debe traducirse (whitelist estricta)."""
@@ -377,7 +645,14 @@ class ContentExtractor:
             return True
         return False
 
-    def _process_json_value(self, value: str, key: str, path: str, segments: List[Segment]) -> None:
+    def _process_json_value(
+        self,
+        value: str,
+        key: str,
+        path: str,
+        segments: List[Segment],
+        keys: Tuple[Any, ...]
+    ) -> None:
         """Procesar un valor de string en JSON Rise."""
         text = self._clean_html(value) if '<' in value else value.strip()
 
@@ -397,7 +672,8 @@ class ContentExtractor:
                 id=seg_id,
                 text=value,  # Mantener original con HTML
                 path=path,
-                is_html='<' in value
+                is_html='<' in value,
+                json_keys=keys
             ))
     
     def _extract_html(self, html_path: Path, rel_path: str) -> List[Segment]:
@@ -405,17 +681,19 @@ class ContentExtractor:
         segments = []
 
         try:
-            with open(html_path, 'r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f, 'html.parser')
+            raw = html_path.read_bytes()
+            root = lhtml.document_fromstring(raw, parser=_HTML_PARSER)
 
-            # Eliminar tags a ignorar
-            for tag in soup.find_all(self.SKIP_TAGS):
-                tag.decompose()
+            # Eliminar tags a ignorar (drop_tree conserva el texto que les sigue)
+            for tag in list(root.iter(*self.SKIP_TAGS)):
+                tag.drop_tree()
 
-            # Extraer textos y atributos
-            for i, elem in enumerate(soup.find_all(self.TEXT_TAGS)):
+            # Extraer textos y atributos (orden de documento)
+            for i, elem in enumerate(root.iter(*self.TEXT_TAGS)):
                 self._extract_element_and_attrs(elem, i, rel_path, segments)
 
+            self._locate_segments(raw, segments)
+
         except (IOError, OSError) as e:
             logger.error(f"Cannot read HTML file: {html_path}", exc_info=True)
         except Exception as e:
@@ -425,134 +703,455 @@ class ContentExtractor:
 
     def _extract_element_and_attrs(self, elem, index: int, rel_path: str, segments: List[Segment]) -> None:
         """Extraer texto de elemento HTML y sus atributos traducibles."""
-        text = elem.get_text(strip=True)
+        # Nodos de texto recortados y concatenados (sin comentarios)
+        text = ''.join(chunk.strip() for chunk in elem.itertext())
         if text and len(text) >= 3:
-            tag_name = elem.name
+            tag_name = elem.tag
             seg_id = f"html_{rel_path}_{tag_name}_{index}"
             segments.append(Segment(id=seg_id, text=text, path=f"//{tag_name}[{index}]"))
 
-        # Extraer atributos traducibles
-        for attr in self.TRANSLATABLE_ATTRS:
-            if elem.has_attr(attr):
-                attr_text = elem[attr]
-                if attr_text and len(attr_text) >= 3:
-                    tag_name = elem.name
-                    seg_id = f"html_{rel_path}_{tag_name}_{index}_{attr}"
-                    segments.append(Segment(
-                        id=seg_id,
-                        text=attr_text,
-                        path=f"//{tag_name}[{index}]/@{attr}"
-                    ))
+        # Extraer atributos traducibles (un recorrido de los atributos presentes)
+        for attr, attr_text in elem.attrib.items():
+            if attr in self.TRANSLATABLE_ATTRS and attr_text and len(attr_text) >= 3:
+                tag_name = elem.tag
+                seg_id = f"html_{rel_path}_{tag_name}_{index}_{attr}"
+                segments.append(Segment(
+                    id=seg_id,
+                    text=attr_text,
+                    path=f"//{tag_name}[{index}]/@{attr}"
+                ))
     
-    def _clean_html(self, html: str) -> str:
-        """Extraer texto de HTML."""
-        soup = BeautifulSoup(html, 'html.parser')
-        return soup.get_text(separator=' ', strip=True)
+    def _locate_segments(self, raw: bytes, segments: List[Segment]) -> None:
+        """Registrar el offset en bytes de cada segmento dentro del original.
+
+        Cada segmento toma la primera aparición de su texto que no solape con
+        la de un segmento anterior, de modo que textos repetidos (botones,
+        etiquetas) se asignan en orden de documento. Cada texto reanuda la
+        búsqueda tras su última aparición asignada: las anteriores ya solapan
+        y no se vuelven a escanear.
+        """
+        claimed: List[tuple[int, int]] = []
+        cursors: dict[bytes, int] = {}
+        for seg in segments:
+            needle = seg.text.encode('utf-8')
+            seg.offset = self._find_unclaimed(raw, needle, claimed, cursors.get(needle, 0))
+            cursors[needle] = seg.offset + 1 if seg.offset != -1 else len(raw) + 1
+            if seg.offset != -1:
+                bisect.insort(claimed, (seg.offset, seg.offset + len(needle)))
+
+    def _find_unclaimed(self, raw: bytes, needle: bytes, claimed: List[tuple[int, int]], start: int = 0) -> int:
+        """Buscar desde `start` la primera aparición de `needle` fuera de los rangos ya asignados."""
+        idx = raw.find(needle, start)
+        while idx != -1 and self._overlaps(claimed, idx, idx + len(needle)):
+            idx = raw.find(needle, idx + 1)
+        return idx
+
+    def _overlaps(self, claimed: List[tuple[int, int]], start: int, end: int) -> bool:
+        """Verificar si [start, end) solapa con algún rango de `claimed` (ordenado)."""
+        pos = bisect.bisect_left(claimed, (start, end))
+        if pos > 0 and claimed[pos - 1][1] > start:
+            return True
+        return pos < len(claimed) and claimed[pos][0] < end
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _clean_html(html: str) -> str:
+        """Extraer texto de HTML (cacheado: Rise repite mucho HTML idéntico)."""
+        if '<' not in html:
+            return _RE_WHITESPACE.sub(' ', html).strip()
+        try:
+            fragment = lhtml.fragment_fromstring(html, create_parent='div')
+        except etree.ParserError:
+            return _RE_WHITESPACE.sub(' ', html).strip()
+        return _RE_WHITESPACE.sub(' ', ' '.join(fragment.itertext())).strip()
     
     def _is_non_text(self, text: str) -> bool:
         """Verificar si parece URL, ID, código, etc."""
-        if text.startswith(('http://', 'https://', '//', 'mailto:')):
-            return True
-        if re.match(r'^[a-f0-9\-]{32,}$', text.lower()):
-            return True
-        if re.match(r'^#[0-9a-fA-F]{3,8}$', text):
-            return True
-        if re.match(r'^[\d.,\s]+$', text):
-            return True
-        return False
-    
-    def _is_real_text(self, text: str) -> bool:
-        """Verificar si parece texto real traducible."""
-        if not re.search(r'[a-zA-ZáéíóúñüÁÉÍÓÚÑÜàèìòùç]', text):
-            return False
-        words = re.findall(r'\b\w+\b', text)
-        return len(words) >= 1
+        return _RE_NON_TEXT.match(text) is not None
 
 
 # ============================================================================
 # TRADUCTOR
 # ============================================================================
 
+class _SessionRequests:
+    """Sustituto del módulo `requests` dentro de deep_translator.
+
+    `GoogleTranslator.translate` llama a `requests.get`, que crea una `Session`
+    (y una conexión TLS) nueva en cada petición. Aquí cada hilo reutiliza su
+    propia `Session`, así que la conexión keep-alive se conserva entre
+    peticiones (`Session` no es segura entre hilos).
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+        kwargs.setdefault('timeout', HTTP_TIMEOUT)
+        return session.get(url, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        import requests
+        return getattr(requests, name)
+
+
+@functools.cache
+def _google_translator_class() -> type:
+    """Importar deep_translator (y requests) en la primera traducción.
+
+    Son ~2/3 del tiempo de importación del script: `--help`, los errores de
+    argumentos o un batch sin pendientes no llegan a cargarlos.
+    """
+    import deep_translator.google
+    deep_translator.google.requests = _SessionRequests()
+    return deep_translator.google.GoogleTranslator
+
+
+class RateLimiter:
+    """Token bucket asíncrono: como máximo `rate` peticiones por segundo."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Esperar hasta disponer de un token y consumirlo."""
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            if self._updated is not None:
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._tokens, self._updated = 1, asyncio.get_running_loop().time()
+            self._tokens -= 1
+
+
+class TranslationMemory:
+    """Memoria de traducción persistente en SQLite, compartida entre ejecuciones.
+
+    Clave: (sha1 del texto origen, idioma origen, idioma destino). Las
+    cadenas repetidas entre cursos (navegación, botones) no vuelven a
+    enviarse a Google Translate.
+    """
+
+    SELECT_SQL = 'SELECT hash, target FROM tm WHERE src = ? AND tgt = ? AND hash IN ({})'
+    INSERT_SQL = 'INSERT OR IGNORE INTO tm (hash, src, tgt, target) VALUES (?, ?, ?, ?)'
+
+    # Filas por transacción al guardar traducciones nuevas
+    INSERT_CHUNK = 1000
+    # Claves por consulta `IN (...)` (por debajo del límite de parámetros de SQLite)
+    SELECT_CHUNK = 500
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tm (hash BLOB, src TEXT, tgt TEXT, target TEXT NOT NULL,'
+            ' PRIMARY KEY (hash, src, tgt)) WITHOUT ROWID'
+        )
+
+    def close(self) -> None:
+        """Cerrar la conexión."""
+        self._conn.close()
+
+    def lookup(self, texts: List[str], source: str, target: str) -> Dict[str, str]:
+        """Traducciones ya memorizadas de `texts` (solo las encontradas).
+
+        Una consulta por bloque de `SELECT_CHUNK` textos, no una por texto.
+        """
+        keys = {self._key(text): text for text in texts}
+        hashes = list(keys)
+        found = {}
+        for start in range(0, len(hashes), self.SELECT_CHUNK):
+            chunk = hashes[start:start + self.SELECT_CHUNK]
+            sql = self.SELECT_SQL.format(', '.join('?' * len(chunk)))
+            for key, result in self._conn.execute(sql, (source, target, *chunk)):
+                found[keys[key]] = result
+        return found
+
+    def store(self, translations: Dict[str, str], source: str, target: str) -> None:
+        """Memorizar traducciones nuevas en transacciones de `INSERT_CHUNK` filas."""
+        rows = [(self._key(text), source, target, result) for text, result in translations.items()]
+        for start in range(0, len(rows), self.INSERT_CHUNK):
+            self._conn.execute('BEGIN')
+            self._conn.executemany(self.INSERT_SQL, rows[start:start + self.INSERT_CHUNK])
+            self._conn.execute('COMMIT')
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha1(text.encode('utf-8')).digest()
+
+
 class Translator:
     """Traductor usando Google Translate."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_parallel_languages: int = MAX_PARALLEL_LANGUAGES,
+        memory: Optional[TranslationMemory] = None
+    ):
         self.chars_translated = 0
+        self.memory_hits = 0
+        # Segmentos que se quedan en el idioma original por fallos de traducción
+        self.failed_segments = 0
+        self._memory = memory
+        self._limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+        # Traducciones ya obtenidas: (origen, destino, texto) -> traducción
+        self._cache: dict[tuple[str, str, str], str] = {}
+        # Textos pedidos por otra llamada concurrente (otro paquete del modo
+        # batch) y aún sin respuesta: se espera a esa petición en vez de repetirla
+        self._inflight: dict[tuple[str, str, str], asyncio.Future] = {}
+        # Hilos propios para las peticiones HTTP, tantos como peticiones en vuelo
+        self._executor = ThreadPoolExecutor(
+            max_workers=MAX_PARALLEL_REQUESTS * max_parallel_languages,
+            thread_name_prefix='gtrans'
+        )
+        self._local = threading.local()
+
+    def warm_up(self) -> None:
+        """Cargar el cliente de Google en segundo plano, solapado con la extracción del ZIP.
+
+        Sin efecto si ya está cargado; un fallo se repetirá (y registrará) en la
+        primera traducción.
+        """
+        self._executor.submit(_google_translator_class)
+
+    def close(self) -> None:
+        """Liberar los hilos de traducción y la memoria persistente."""
+        self._executor.shutdown(wait=False)
+        if self._memory is not None:
+            self._memory.close()
     
+    # Texto de estas etiquetas no es visible y no se traduce
+    SKIP_TEXT_TAGS = frozenset({'script', 'style'})
+
+    # Límites de cada lote (longitud máxima de Google Translate: 5000 caracteres)
+    BATCH_MAX_CHARS = 5000
+    BATCH_MAX_TEXTS = 100
+
     async def translate(
         self,
         segments: List[Segment],
         source_lang: str,
         target_lang: str
-    ) -> Dict[str, str]:
-        """Traducir lista de segmentos."""
-        translations = {}
+    ) -> Tuple[Dict[str, str], int]:
+        """Traducir lista de segmentos.
 
-        for i, seg in enumerate(segments):
-            await self._translate_segment_safe(seg, source_lang, target_lang, i, len(segments), translations)
+        Los textos de todos los segmentos (nodos de texto en los HTML) se
+        traducen en lotes y después se reensambla cada segmento.
 
-        return translations
+        Returns:
+            (traducciones, nº de segmentos que se quedan en el idioma original
+            por fallos de esta llamada)
+        """
+        parts = [self._split_segment(seg) for seg in segments]
+        texts = [text for _, _, seg_texts in parts for text in seg_texts]
+        results = iter(await self._translate_texts(texts, source_lang, target_lang))
 
-    async def _translate_segment_safe(
-        self,
-        seg: Segment,
-        source_lang: str,
-        target_lang: str,
-        index: int,
-        total: int,
-        translations: Dict[str, str]
-    ) -> None:
-        """Traducir segmento de forma segura con logging y rate limiting."""
-        try:
-            result = await self._translate_segment(seg, source_lang, target_lang)
-            if result:
-                translations[seg.id] = result
+        translations = {}
+        failed = 0
+        for seg, (root, slots, seg_texts) in zip(segments, parts):
+            translated = [next(results) for _ in seg_texts]
+            if not seg_texts:
+                continue
+            if None in translated:
+                failed += 1
+                logger.error(f"Error translating segment {seg.id}", extra={"segment": seg.id})
+                translations[seg.id] = seg.text  # Mantener original
+            else:
+                translations[seg.id] = self._join_segment(root, slots, translated)
+        self.failed_segments += failed
+        return translations, failed
 
-            # Log de progreso cada 50 segmentos
-            if (index + 1) % 50 == 0:
-                logger.debug("Translation progress", extra={"current": index + 1, "total": total})
+    def _split_segment(self, seg: Segment) -> Tuple[Any, List[Tuple[Any, str]], List[str]]:
+        """Textos a traducir de un segmento: (raíz HTML, huecos text/tail, textos)."""
+        if not seg.is_html:
+            return None, [], [seg.text] if seg.text and len(seg.text) >= 2 else []
 
-            # Pequeña pausa para evitar rate limiting
-            if (index + 1) % 20 == 0:
-                await asyncio.sleep(0.5)
+        try:
+            root = lhtml.fragment_fromstring(seg.text, create_parent='div')
+        except etree.ParserError:
+            return None, [], []
+
+        slots = []
+        for elem in root.iter():
+            # Comentarios/PIs: solo su tail es texto visible
+            if isinstance(elem.tag, str) and elem.tag not in self.SKIP_TEXT_TAGS:
+                slots.append((elem, 'text'))
+            if elem is not root:
+                slots.append((elem, 'tail'))
+        slots = [(elem, attr) for elem, attr in slots if len((getattr(elem, attr) or '').strip()) >= 2]
+        return root, slots, [getattr(elem, attr).strip() for elem, attr in slots]
+
+    def _join_segment(self, root: Any, slots: List[Tuple[Any, str]], translated: List[str]) -> str:
+        """Reensamblar un segmento con sus textos traducidos."""
+        if root is None:
+            return translated[0]
+        for (elem, attr), text in zip(slots, translated):
+            # Google recorta los espacios: se conservan los del original
+            original = getattr(elem, attr)
+            lead = original[:len(original) - len(original.lstrip())]
+            trail = original[len(original.rstrip()):]
+            setattr(elem, attr, lead + text + trail)
+        return (root.text or '') + ''.join(
+            etree.tostring(child, encoding='unicode', method='html') for child in root
+        )
 
+    async def _translate_texts(self, texts: List[str], source: str, target: str) -> List[Optional[str]]:
+        """Traducir textos (None si uno falla); solo se piden los únicos no cacheados."""
+        pending = list(dict.fromkeys(
+            text for text in texts if (source, target, text) not in self._cache
+        ))
+        pending = self._recall(pending, source, target)
+        keys = [(source, target, text) for text in pending]
+        shared = [self._inflight[key] for key in keys if key in self._inflight]
+        owned = [text for key, text in zip(keys, pending) if key not in self._inflight]
+        loop = asyncio.get_running_loop()
+        for text in owned:
+            self._inflight[(source, target, text)] = loop.create_future()
+
+        results: List[Optional[str]] = [None] * len(owned)
+        try:
+            results = await self._translate_batches(owned, source, target)
+        finally:
+            self._settle(owned, results, source, target)
+        await asyncio.gather(*shared)
+        return [self._cache.get((source, target, text)) for text in texts]
+
+    def _settle(self, texts: List[str], results: List[Optional[str]], source: str, target: str) -> None:
+        """Guardar resultados en caché y memoria y liberar a quien los esperaba."""
+        fresh = {text: result for text, result in zip(texts, results) if result is not None}
+        for text, result in fresh.items():
+            self._cache[(source, target, text)] = result
+        # Liberar antes de persistir: un fallo de SQLite no debe dejar a nadie esperando
+        for text in texts:
+            self._inflight.pop((source, target, text)).set_result(None)
+        if self._memory is not None and fresh:
+            try:
+                self._memory.store(fresh, source, target)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not store translations in memory: {e}")
+
+    def _recall(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Cargar en caché lo que ya está en la memoria persistente; retorna lo que falta."""
+        if self._memory is None or not texts:
+            return texts
+        try:
+            remembered = self._memory.lookup(texts, source, target)
+        except sqlite3.Error as e:
+            # Memoria opcional: si falla (bloqueada, corrupta) todo se traduce de nuevo
+            logger.warning(f"Could not read translation memory: {e}")
+            return texts
+        for text, result in remembered.items():
+            self._cache[(source, target, text)] = result
+        self.memory_hits += len(remembered)
+        return [text for text in texts if text not in remembered]
+
+    async def _translate_batches(self, texts: List[str], source: str, target: str) -> List[Optional[str]]:
+        """Traducir textos en lotes concurrentes (None si un texto falla)."""
+        batches = self._make_batches(texts)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_REQUESTS)
+
+        async def bounded(batch: List[str]) -> List[Optional[str]]:
+            async with semaphore:
+                return await self._translate_batch(batch, source, target)
+
+        results = await asyncio.gather(*(bounded(batch) for batch in batches))
+        logger.debug("Translation batches done", extra={"batches": len(batches), "texts": len(texts)})
+        return [text for batch in results for text in batch]
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Agrupar textos en orden; los que contienen saltos de línea van solos."""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for text in texts:
+            full = size + len(text) + 1 > self.BATCH_MAX_CHARS or len(current) >= self.BATCH_MAX_TEXTS
+            if current and ('\n' in text or full):
+                batches.append(current)
+                current, size = [], 0
+            current.append(text)
+            size += len(text) + 1
+            if '\n' in text:
+                batches.append(current)
+                current, size = [], 0
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _translate_batch(self, batch: List[str], source: str, target: str) -> List[Optional[str]]:
+        """Traducir un lote en una sola petición (textos unidos por saltos de línea).
+
+        Si la respuesta no conserva una línea por texto se traduce uno a uno.
+        Aunque el número de líneas coincida, Google puede fusionar una y partir
+        otra: las líneas que no superan `_plausible_line` se vuelven a pedir
+        solas para no cachear (ni memorizar) traducciones desplazadas.
+        """
+        results: List[Optional[str]] = [None] * len(batch)
+        if len(batch) > 1:
+            joined = await self._translate_one('\n'.join(batch), source, target)
+            lines = joined.split('\n') if joined is not None else []
+            if len(lines) == len(batch):
+                results = [
+                    line if self._plausible_line(text, line) else None
+                    for text, line in zip(batch, lines)
+                ]
+                self.chars_translated += sum(len(t) for t, r in zip(batch, results) if r is not None)
+                if None in results:
+                    logger.debug("Suspicious batch lines, retranslating them one by one", extra={
+                        "texts": len(batch), "suspicious": results.count(None)
+                    })
+            else:
+                logger.debug("Batch line count mismatch, translating one by one", extra={"texts": len(batch)})
+
+        for i, text in enumerate(batch):
+            if results[i] is None:
+                results[i] = await self._translate_one(text, source, target)
+                if results[i] is not None:
+                    self.chars_translated += len(text)
+        return results
+
+    @staticmethod
+    def _plausible_line(source: str, translated: str) -> bool:
+        """Línea de un lote que corresponde a su texto: no vacía y con los mismos números (en cualquier orden)."""
+        return bool(translated.strip()) and sorted(_RE_DIGITS.findall(source)) == sorted(_RE_DIGITS.findall(translated))
+
+    async def _translate_one(self, text: str, source: str, target: str) -> Optional[str]:
+        """Traducir un texto; None si la petición falla."""
+        try:
+            return await self._translate_text(text, source, target)
         except Exception as e:
-            logger.error(f"Error translating segment {seg.id}", extra={"segment": seg.id}, exc_info=True)
-            translations[seg.id] = seg.text  # Mantener original
-
-    async def _translate_segment(self, seg: Segment, source_lang: str, target_lang: str) -> Optional[str]:
-        """Traducir un segmento individual."""
-        if seg.is_html:
-            return await self._translate_html_segment(seg.text, source_lang, target_lang)
-
-        if not seg.text or len(seg.text) < 2:
+            logger.warning(f"Translation request failed: {e}", exc_info=True)
             return None
 
-        translated = await self._translate_text(seg.text, source_lang, target_lang)
-        self.chars_translated += len(seg.text)
-        return translated
+    async def _translate_text(self, text: str, source: str, target: str) -> str:
+        """Traducir texto individual (limitado por el token bucket compartido)."""
+        await self._limiter.acquire()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._translate_sync, text, source, target)
 
-    async def _translate_html_segment(self, html: str, source_lang: str, target_lang: str) -> str:
-        """Traducir HTML nodo por nodo preservando estructura."""
-        from bs4 import NavigableString
-        soup = BeautifulSoup(html, 'html.parser')
+    def _translate_sync(self, text: str, source: str, target: str) -> str:
+        """Traducir en el hilo actual reutilizando su cliente para el par de idiomas.
 
-        for node in list(soup.descendants):
-            if isinstance(node, NavigableString) and node.strip() and len(node.strip()) >= 2:
-                translated = await self._translate_text(str(node), source_lang, target_lang)
-                self.chars_translated += len(node)
-                node.replace_with(translated)
+        `GoogleTranslator.translate` modifica el estado de la instancia, así que
+        los clientes no se comparten entre hilos (uno por hilo y par).
+        """
+        clients = self._local.__dict__.setdefault('clients', {})
+        client = clients.get((source, target))
+        if client is None:
+            translator_class = _google_translator_class()
+            client = clients[(source, target)] = translator_class(source=source, target=target)
+        return client.translate(text)
 
-        return str(soup)
-
-    async def _translate_text(self, text: str, source: str, target: str) -> str:
-        """Traducir texto individual."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: GoogleTranslator(source=source, target=target).translate(text)
-        )
-    
 
 
 # ============================================================================
@@ -561,7 +1160,17 @@ class Translator:
 
 class ScormRebuilder:
     """Reconstructor de paquetes SCORM traducidos."""
-    
+
+    # Bits de `ZipInfo.flag_bits` relevantes para la copia en bruto
+    ZIP_FLAG_ENCRYPTED = 0x01
+    ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+
+    # Tamaño de bloque al copiar entradas sin modificar
+    COPY_CHUNK_SIZE = 1024 * 1024
+
+    # Hilos que aplican traducciones a los archivos de un mismo paquete
+    APPLY_WORKERS = 4
+
     def rebuild(
         self,
         package: ScormPackage,
@@ -570,247 +1179,491 @@ class ScormRebuilder:
         output_dir: Path,
         target_lang: str
     ) -> Path:
-        """Reconstruir SCORM con traducciones."""
-        working_dir = output_dir / f"work_{target_lang}"
-        self._prepare_working_dir(working_dir, package.extracted_path)
-        self._apply_translations_to_files(working_dir, extraction, translations)
+        """Reconstruir SCORM con traducciones.
 
-        output_path = self._create_zip(package, working_dir, output_dir, target_lang)
-        shutil.rmtree(working_dir, ignore_errors=True)
+        El ZIP destino se ensambla directamente desde el ZIP original: los
+        archivos con segmentos se traducen en memoria y el resto se copia tal
+        cual, sin directorio de trabajo intermedio.
 
+        Se escribe en un `.part` que se renombra al terminar: un error o una
+        interrupción nunca dejan un ZIP a medias con el nombre definitivo.
+        """
+        output_path = self.output_path(output_dir, package.zip_path, target_lang)
+        partial_path = output_path.with_name(output_path.name + '.part')
+        try:
+            self._create_zip(package, extraction, translations, partial_path)
+            os.replace(partial_path, output_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
         return output_path
 
-    def _prepare_working_dir(self, working_dir: Path, source_path: Path) -> None:
-        """Preparar directorio de trabajo limpio."""
-        if working_dir.exists():
-            shutil.rmtree(working_dir)
-        shutil.copytree(source_path, working_dir)
+    @staticmethod
+    def output_path(output_dir: Path, zip_path: Path, target_lang: str) -> Path:
+        """Ruta del ZIP traducido de un idioma."""
+        return output_dir / f"{zip_path.stem}_{target_lang}.zip"
 
-    def _apply_translations_to_files(
+    def _create_zip(
         self,
-        working_dir: Path,
+        package: ScormPackage,
         extraction: ExtractionResult,
-        translations: Dict[str, str]
+        translations: Dict[str, str],
+        output_path: Path
     ) -> None:
-        """Aplicar traducciones a cada archivo del paquete."""
-        for file_path, segments in extraction.files.items():
-            full_path = working_dir / file_path
-
-            if file_path == 'imsmanifest.xml':
-                self._apply_to_manifest(full_path, segments, translations)
-            elif self._is_rise_file(full_path):
-                self._apply_to_rise(full_path, segments, translations)
-            else:
-                self._apply_to_html(full_path, segments, translations)
+        """Crear archivo ZIP preservando estructura exacta del original.
 
-    def _create_zip(self, package: ScormPackage, working_dir: Path, output_dir: Path, target_lang: str) -> Path:
-        """Crear archivo ZIP preservando estructura exacta del original."""
-        import unicodedata
-        output_name = f"{package.zip_path.stem}_{target_lang}.zip"
-        output_path = output_dir / output_name
+        Los archivos con cambios se traducen y comprimen en paralelo en un pool
+        de hilos; la escritura en el ZIP sigue siendo secuencial y en el orden
+        original.
+        """
+        with zipfile.ZipFile(package.zip_path, 'r') as z_orig, zipfile.ZipFile(output_path, 'w') as z_out, \
+                ThreadPoolExecutor(max_workers=self.APPLY_WORKERS) as pool:
+            pending = self._submit_changed_entries(pool, z_orig, package, extraction, translations)
+            for info in z_orig.infolist():
+                future = pending.get(info)
+                if future is None:
+                    # Entrada original o sin cambios: copiar exactamente (preserva
+                    # __MACOSX, etc.) sin el ciclo base64 -> JSON -> base64 de Rise
+                    self._copy_original_entry(z_orig, z_out, info)
+                    continue
+                self._write_compressed_entry(z_out, *future.result())
 
-        # Mapear archivos modificados en working_dir (nombre normalizado -> path)
-        modified_files = self._build_modified_files_map(package, working_dir)
+    def _submit_changed_entries(
+        self,
+        pool: ThreadPoolExecutor,
+        z_orig: zipfile.ZipFile,
+        package: ScormPackage,
+        extraction: ExtractionResult,
+        translations: Dict[str, str]
+    ) -> Dict[zipfile.ZipInfo, Any]:
+        """Encolar en el pool las entradas con traducciones: ZipInfo -> future."""
+        import unicodedata
+        translated_entries = self._map_translated_entries(package, extraction)
+        pending = {}
+        for info in z_orig.infolist():
+            rel_path = translated_entries.get(unicodedata.normalize('NFC', info.filename))
+            if rel_path is not None and self._has_changes(extraction.files[rel_path], translations):
+                pending[info] = pool.submit(self._build_entry, package, rel_path, info, extraction, translations)
+        return pending
+
+    def _build_entry(
+        self,
+        package: ScormPackage,
+        rel_path: str,
+        info: zipfile.ZipInfo,
+        extraction: ExtractionResult,
+        translations: Dict[str, str]
+    ) -> Tuple[zipfile.ZipInfo, bytes]:
+        """Traducir y comprimir un archivo (tarea del pool: zlib libera el GIL).
 
-        with zipfile.ZipFile(package.zip_path, 'r') as z_orig:
-            with zipfile.ZipFile(output_path, 'w') as z_out:
-                for info in z_orig.infolist():
-                    # Normalizar nombre para buscar en modified_files
-                    normalized = unicodedata.normalize('NFC', info.filename)
+        Se comprime con el mismo método que la entrada original, como haría
+        `writestr`, y se retorna el ZipInfo con CRC y tamaños ya calculados.
+        """
+        data = self._translate_entry(package, rel_path, extraction, translations)
+        new_info = copy.copy(info)  # Preserva TODOS los atributos
+        compressor = zipfile._get_compressor(info.compress_type)
+        payload = compressor.compress(data) + compressor.flush() if compressor else data
+        new_info.file_size = len(data)
+        new_info.compress_size = len(payload)
+        new_info.CRC = binascii.crc32(data)
+        # Mismos flags que `writestr` (el original podía estar cifrado o usar data descriptor)
+        new_info.flag_bits = zipfile._MASK_COMPRESS_OPTION_1 if info.compress_type == zipfile.ZIP_LZMA else 0
+        return new_info, payload
+
+    def _translate_entry(
+        self,
+        package: ScormPackage,
+        rel_path: str,
+        extraction: ExtractionResult,
+        translations: Dict[str, str]
+    ) -> bytes:
+        """Aplicar traducciones a un archivo (tarea del pool de hilos)."""
+        with self._map_source(package, rel_path) as source:
+            data = self._apply_translations(rel_path, source, extraction, translations)
+            # Ante un error se devuelve el propio mmap: copiarlo antes de cerrarlo
+            return bytes(data) if data is source else data
+
+    @contextmanager
+    def _map_source(self, package: ScormPackage, rel_path: str) -> Iterator[bytes]:
+        """Proyectar en memoria (mmap, solo lectura) el original de un archivo traducible.
+
+        El directorio extraído nunca se modifica, así que actúa como snapshot
+        compartido por todos los idiomas: no se vuelve a descomprimir del ZIP
+        ni se copia el fichero completo a un `bytes` de Python.
+        """
+        with open(package.extracted_path / rel_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''  # mmap no admite ficheros vacíos
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
 
-                    if normalized in modified_files:
-                        # Archivo traducido: usar contenido del working_dir
-                        self._write_modified_entry(z_out, info, modified_files[normalized])
-                    else:
-                        # Entrada original: copiar exactamente (preserva __MACOSX, etc.)
-                        self._copy_original_entry(z_orig, z_out, info)
+    def _map_translated_entries(self, package: ScormPackage, extraction: ExtractionResult) -> dict[str, str]:
+        """Construir mapa arcname normalizado (NFC) -> ruta relativa en `extraction.files`."""
+        import unicodedata
+        prefix = f"{package.root_dir}/" if package.root_dir else ""
+        return {
+            unicodedata.normalize('NFC', f"{prefix}{Path(rel_path).as_posix()}"): rel_path
+            for rel_path in extraction.files
+        }
 
-        return output_path
+    def _has_changes(self, segments: List[Segment], translations: Dict[str, str]) -> bool:
+        """Verificar si alguna traducción difiere del texto original de su segmento."""
+        return any(translations.get(seg.id, seg.text) != seg.text for seg in segments)
 
-    def _build_modified_files_map(self, package: ScormPackage, working_dir: Path) -> dict[str, Path]:
-        """Construir mapa de archivos modificados: arcname normalizado -> path local."""
-        import unicodedata
-        modified: dict[str, Path] = {}
-        for file in working_dir.rglob('*'):
-            if file.is_file():
-                rel_path = file.relative_to(working_dir)
-                if package.root_dir:
-                    arcname = f"{package.root_dir}/{rel_path}"
-                else:
-                    arcname = str(rel_path)
-                arcname = unicodedata.normalize('NFC', arcname)
-                modified[arcname] = file
-        return modified
+    def _apply_translations(
+        self,
+        rel_path: str,
+        data: bytes,
+        extraction: ExtractionResult,
+        translations: Dict[str, str]
+    ) -> bytes:
+        """Aplicar traducciones al contenido de un archivo según su tipo.
 
-    def _write_modified_entry(self, z_out: zipfile.ZipFile, orig_info: zipfile.ZipInfo, local_path: Path) -> None:
-        """Escribir archivo modificado preservando atributos del original."""
-        new_info = copy.copy(orig_info)  # Preserva TODOS los atributos
-        with open(local_path, 'rb') as f:
-            z_out.writestr(new_info, f.read())
+        El tipo (Rise o HTML) ya se decidió en la extracción: no se vuelve a
+        inspeccionar el contenido.
+        """
+        segments = extraction.files[rel_path]
+        if rel_path == 'imsmanifest.xml':
+            return self._apply_to_manifest(data, rel_path, segments, translations)
+        if rel_path in extraction.rise_files:
+            return self._apply_to_rise(data, rel_path, segments, translations)
+        return self._apply_to_html(data, rel_path, segments, translations)
+
+    def _write_compressed_entry(self, z_out: zipfile.ZipFile, new_info: zipfile.ZipInfo, payload: bytes) -> None:
+        """Escribir una entrada ya comprimida en el pool (mismo criterio ZIP64 que `writestr`)."""
+        zip64 = new_info.file_size * 1.05 > zipfile.ZIP64_LIMIT
+        self._append_raw_entry(z_out, new_info, zip64, lambda fp: fp.write(payload))
 
     def _copy_original_entry(self, z_orig: zipfile.ZipFile, z_out: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
-        """Copiar entrada del ZIP original preservando todos los atributos."""
-        new_info = copy.copy(info)  # Preserva TODOS los atributos
-        z_out.writestr(new_info, z_orig.read(info.filename))
-    
-    def _is_rise_file(self, path: Path) -> bool:
-        """Verificar si es archivo Rise."""
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(5000)
-            return 'deserialize(' in content
-        except (IOError, OSError) as e:
-            logger.debug(f"Cannot read file to check if Rise: {path}", exc_info=True)
-            return False
-    
-    def _apply_to_manifest(self, path: Path, segments: List[Segment], translations: Dict[str, str]):
-        """Aplicar traducciones al manifest XML preservando formato original."""
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        """Copiar entrada del ZIP original preservando todos los atributos.
 
-            # Reemplazar textos dentro de tags <title>
-            for seg in segments:
-                if seg.id in translations:
-                    # Escapar caracteres XML en el texto original y traducido
-                    orig_escaped = seg.text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                    trans_escaped = translations[seg.id].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                    # Reemplazar primera ocurrencia
-                    content = content.replace(f'<title>{seg.text}</title>', f'<title>{translations[seg.id]}</title>', 1)
-                    if orig_escaped != seg.text:
-                        content = content.replace(f'<title>{orig_escaped}</title>', f'<title>{trans_escaped}</title>', 1)
-
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
-        except (IOError, OSError) as e:
-            logger.error(f"Cannot read/write manifest {path}", exc_info=True)
-        except Exception as e:
-            logger.error(f"Error applying translations to manifest: {e}", exc_info=True)
-
-    def _apply_segment_to_manifest(self, tree, seg: Segment, translations: Dict[str, str]) -> None:
-        """Aplicar traducción de un segmento en el XML del manifest."""
-        if seg.id not in translations:
+        Los bytes ya comprimidos se copian en bruto (sin descomprimir ni
+        recomprimir). Las entradas cifradas se recomprimen en streaming: su
+        byte de verificación depende del flag de data descriptor.
+        """
+        new_info = copy.copy(info)  # Preserva TODOS los atributos
+        if info.flag_bits & self.ZIP_FLAG_ENCRYPTED:
+            with z_orig.open(info) as src, z_out.open(new_info, 'w') as dst:
+                shutil.copyfileobj(src, dst, self.COPY_CHUNK_SIZE)
             return
 
+        # CRC y tamaños ya conocidos: van en la cabecera local, sin data descriptor
+        new_info.flag_bits &= ~self.ZIP_FLAG_DATA_DESCRIPTOR
+        zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+        self._append_raw_entry(z_out, new_info, zip64, lambda fp: self._copy_raw_data(z_orig, info, fp))
+
+    def _append_raw_entry(self, z_out: zipfile.ZipFile, new_info: zipfile.ZipInfo, zip64: bool, write_data) -> None:
+        """Añadir una entrada con datos ya comprimidos (CRC y tamaños fijados en `new_info`)."""
+        with z_out._lock:
+            z_out.fp.seek(z_out.start_dir)
+            new_info.header_offset = z_out.fp.tell()
+            z_out._writecheck(new_info)
+            z_out._didModify = True
+            z_out.fp.write(new_info.FileHeader(zip64))
+            write_data(z_out.fp)
+            z_out.start_dir = z_out.fp.tell()
+            z_out.filelist.append(new_info)
+            z_out.NameToInfo[new_info.filename] = new_info
+
+    def _copy_raw_data(self, z_orig: zipfile.ZipFile, info: zipfile.ZipInfo, dst) -> None:
+        """Copiar los `compress_size` bytes comprimidos de una entrada del original."""
+        z_orig.fp.seek(info.header_offset)
+        header = struct.unpack(zipfile.structFileHeader, z_orig.fp.read(zipfile.sizeFileHeader))
+        if header[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local file header: {info.filename}")
+        z_orig.fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+
+        remaining = info.compress_size
+        while remaining:
+            chunk = z_orig.fp.read(min(self.COPY_CHUNK_SIZE, remaining))
+            if not chunk:
+                raise zipfile.BadZipFile(f"Truncated entry: {info.filename}")
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+    def _apply_to_manifest(
+        self,
+        data: bytes,
+        rel_path: str,
+        segments: List[Segment],
+        translations: Dict[str, str]
+    ) -> bytes:
+        """Aplicar traducciones al manifest XML preservando formato original.
+
+        Un único pase sobre los bytes: cada `<title>` cuyo texto coincide con un
+        segmento se sustituye por la siguiente traducción pendiente de ese texto.
+        """
         try:
-            elements = tree.xpath(seg.path)
-            if elements:
-                elements[0].text = translations[seg.id]
-        except etree.XPathError as e:
-            logger.warning(f"Invalid XPath {seg.path}: {e}")
-    
-    def _apply_to_rise(self, path: Path, segments: List[Segment], translations: Dict[str, str]):
-        """Aplicar traducciones a archivo Rise."""
+            pending = self._manifest_replacements(segments, translations)
+            return _RE_MANIFEST_TITLE.sub(lambda m: self._replace_title(m, pending), data)
+        except Exception as e:
+            logger.error(f"Error applying translations to manifest {rel_path}: {e}", exc_info=True)
+            return data
+
+    def _manifest_replacements(self, segments: List[Segment], translations: Dict[str, str]) -> dict[bytes, deque]:
+        """Traducciones pendientes por texto de `<title>` (forma literal y escapada)."""
+        pending: dict[bytes, deque] = {}
+        for seg in segments:
+            if seg.id not in translations:
+                continue
+            titles = pending.setdefault(seg.text.encode('utf-8'), deque())
+            titles.append(self._xml_escape(translations[seg.id]).encode('utf-8'))
+            pending.setdefault(self._xml_escape(seg.text).encode('utf-8'), titles)
+        return pending
+
+    def _replace_title(self, match: re.Match, pending: dict[bytes, deque]) -> bytes:
+        """Sustituir un `<title>` por su traducción (primera ocurrencia por segmento)."""
+        titles = pending.get(match.group(1))
+        if not titles:
+            return match.group(0)
+        return b'<title>' + titles.popleft() + b'</title>'
+
+    def _xml_escape(self, text: str) -> str:
+        """Escapar caracteres especiales XML en texto."""
+        return text.translate(_XML_ESCAPE_TABLE)
+
+    def _apply_to_rise(
+        self,
+        data: bytes,
+        rel_path: str,
+        segments: List[Segment],
+        translations: Dict[str, str]
+    ) -> bytes:
+        """Aplicar traducciones a archivo Rise (trabaja sobre bytes, sin decodificar el HTML)."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            bounds = self._find_rise_payload(data)
+            if bounds is None:
+                logger.debug(f"No Rise deserialize pattern found in {rel_path}")
+                return data
 
-            match = re.search(r'deserialize\("([A-Za-z0-9+/=]+)"\)', content)
-            if not match:
-                logger.debug(f"No Rise deserialize pattern found in {path}")
-                return
-
-            data = self._decode_rise_content(match.group(1), path)
-            if data is None:
-                return
+            start, end = bounds
+            rise_data = self._decode_rise_content(data[start:end], rel_path)
+            if rise_data is None:
+                return data
 
-            self._apply_to_json(data, "", segments, translations)
-            self._encode_rise_content(path, data, match, content)
+            self._apply_to_json(rise_data, segments, translations)
+            return self._encode_rise_content(rel_path, rise_data, data, start, end)
 
-        except (IOError, OSError) as e:
-            logger.error(f"Cannot read/write Rise file {path}", exc_info=True)
         except Exception as e:
-            logger.error(f"Error applying translations to Rise {path}: {e}", exc_info=True)
+            logger.error(f"Error applying translations to Rise {rel_path}: {e}", exc_info=True)
+            return data
+
+    def _find_rise_payload(self, raw: bytes) -> Optional[tuple[int, int]]:
+        """Localizar los límites (inicio, fin) del base64 dentro de `deserialize("...")`."""
+        match = _RE_DESERIALIZE.search(raw)
+        if not match:
+            return None
+        return match.span(1)
 
-    def _decode_rise_content(self, base64_str: str, path: Path) -> Optional[dict]:
+    def _decode_rise_content(self, payload: bytes, rel_path: str) -> Optional[dict]:
         """Decodificar contenido Rise de base64 a JSON."""
         try:
-            decoded = base64.b64decode(base64_str).decode('utf-8')
-            return json.loads(decoded)
-        except (base64.binascii.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
-            logger.error(f"Invalid Rise JSON encoding in {path}", exc_info=True)
+            return orjson.loads(_b64decode(payload))
+        except (binascii.Error, orjson.JSONDecodeError) as e:
+            logger.error(f"Invalid Rise JSON encoding in {rel_path}", exc_info=True)
             return None
 
-    def _encode_rise_content(self, path: Path, data: dict, match, content: str) -> None:
-        """Recodificar contenido JSON a base64 y escribir archivo."""
-        new_json = json.dumps(data, ensure_ascii=False)
-        new_base64 = base64.b64encode(new_json.encode('utf-8')).decode('utf-8')
+    def _encode_rise_content(self, rel_path: str, rise_data: dict, raw: bytes, start: int, end: int) -> bytes:
+        """Recodificar JSON a base64 y ensamblar prefijo, payload y sufijo."""
+        new_base64 = _b64encode(orjson.dumps(rise_data))
 
         if not new_base64:
-            logger.error(f"Base64 encoding failed for {path}")
-            return
+            logger.error(f"Base64 encoding failed for {rel_path}")
+            return raw
 
-        new_content = content[:match.start(1)] + new_base64 + content[match.end(1):]
+        view = memoryview(raw)
+        return b''.join((view[:start], new_base64, view[end:]))
 
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-    
-    def _apply_to_json(self, data: Any, path: str, segments: List[Segment], translations: Dict[str, str]):
-        """Aplicar traducciones recursivamente a JSON."""
-        if isinstance(data, dict):
-            for key, value in data.items():
-                new_path = f"{path}.{key}" if path else key
-                
-                if isinstance(value, str):
-                    seg_id = f"rise_{new_path.replace('.', '_')}"
-                    if seg_id in translations:
-                        data[key] = translations[seg_id]
-                else:
-                    self._apply_to_json(value, new_path, segments, translations)
-        
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                self._apply_to_json(item, f"{path}[{i}]", segments, translations)
-    
-    def _apply_to_html(self, path: Path, segments: List[Segment], translations: Dict[str, str]):
-        """Aplicar traducciones a HTML estándar (primera ocurrencia por segmento)."""
+    def _apply_to_json(self, data: Any, segments: List[Segment], translations: Dict[str, str]) -> None:
+        """Aplicar traducciones a JSON por acceso directo.
+
+        La extracción ya registró en `json_keys` la ruta de cada segmento, así
+        que no se recorre el JSON: el coste depende solo de los segmentos.
+        """
+        for seg in segments:
+            if seg.id in translations and seg.json_keys:
+                self._set_json_value(data, seg, translations[seg.id])
+
+    def _set_json_value(self, data: Any, seg: Segment, value: str) -> None:
+        """Asignar `value` en la ruta `seg.json_keys` del JSON."""
         try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            node = data
+            for key in seg.json_keys[:-1]:
+                node = node[key]
+            node[seg.json_keys[-1]] = value
+        except (KeyError, IndexError, TypeError) as e:
+            logger.warning(f"Rise JSON path not found for segment {seg.id}: {e}")
+
+    def _apply_to_html(
+        self,
+        data: bytes,
+        rel_path: str,
+        segments: List[Segment],
+        translations: Dict[str, str]
+    ) -> bytes:
+        """Aplicar traducciones a HTML estándar usando los offsets de la extracción."""
+        try:
+            located = self._located_segments(segments, translations)
+            view = memoryview(data)
+            parts: List[bytes] = []
+            last = 0
 
-            # Aplicar cada segmento solo una vez (primera ocurrencia)
-            for seg in segments:
-                if seg.id in translations:
-                    idx = content.find(seg.text)
-                    if idx != -1:
-                        content = content[:idx] + translations[seg.id] + content[idx + len(seg.text):]
-                    else:
-                        logger.warning(f"Segment text not found in HTML: {seg.id}")
+            # Un único pase: tramos originales intercalados con las traducciones
+            for seg in located:
+                parts.append(view[last:seg.offset])
+                parts.append(translations[seg.id].encode('utf-8'))
+                last = seg.offset + len(seg.text.encode('utf-8'))
+            parts.append(view[last:])
 
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            return b''.join(parts)
 
-        except (IOError, OSError) as e:
-            logger.error(f"Cannot write HTML file: {path}", exc_info=True)
         except Exception as e:
-            logger.error(f"Error applying translations to HTML {path}: {e}", exc_info=True)
+            logger.error(f"Error applying translations to HTML {rel_path}: {e}", exc_info=True)
+            return data
+
+    def _located_segments(self, segments: List[Segment], translations: Dict[str, str]) -> List[Segment]:
+        """Segmentos traducidos con offset conocido, ordenados por posición."""
+        located = []
+        for seg in segments:
+            if seg.id not in translations:
+                continue
+            if seg.offset == -1:
+                logger.warning(f"Segment text not found in HTML: {seg.id}")
+            else:
+                located.append(seg)
+        return sorted(located, key=lambda seg: seg.offset)
 
 
+# ============================================================================
+# CÓDIGOS DE SALIDA
+# ============================================================================
+
+class ExitCode(IntEnum):
+    """Códigos de salida del CLI, para que un orquestador (cron, k8s Jobs...)
+    distinga qué reintentar."""
+
+    OK = 0
+    ERROR = 1          # Error inesperado
+    VALIDATION = 2     # Argumentos o paquete SCORM no válidos
+    MT = 3             # Segmentos sin traducir por fallos de Google Translate
+    IO = 4             # Error de lectura/escritura en disco
+    INTERRUPTED = 130  # Ctrl+C (128 + SIGINT)
+
+
+# Errores que abortan un paquete sin detener la ejecución (ver `_exit_code_for`)
+PACKAGE_ERRORS = (OSError, zipfile.BadZipFile, ValueError, etree.LxmlError, sqlite3.Error)
+
+
+def _exit_code_for(error: Exception) -> ExitCode:
+    """Clasificar el error que aborta un paquete."""
+    if isinstance(error, (ValueError, zipfile.BadZipFile, etree.LxmlError)):
+        return ExitCode.VALIDATION
+    if isinstance(error, OSError):
+        return ExitCode.IO
+    return ExitCode.ERROR
+
+
+def _final_exit_code(translator: Translator, failure: ExitCode = ExitCode.OK) -> ExitCode:
+    """Código de salida de una ejecución: el primer fallo, o MT si quedaron segmentos sin traducir."""
+    if failure:
+        return failure
+    return ExitCode.MT if translator.failed_segments else ExitCode.OK
+
 # ============================================================================
 # FUNCIONES CLI AUXILIARES
 # ============================================================================
 
-def _validate_args(args) -> tuple[Path, list[str], str, Path]:
-    """Validar y procesar argumentos de línea de comandos.
+def _validate_args(args) -> tuple[Path, Path]:
+    """Validar archivo y carpeta de salida del modo archivo único.
+
+    Los idiomas ya los procesa `main`; aquí solo se resuelven las rutas.
 
     Returns:
-        (zip_path, target_langs, source_lang, output_dir)
+        (zip_path, output_dir)
     """
-    zip_path = Path(args.archivo)
-    if not zip_path.exists():
-        logger.error(f"File not found: {zip_path}")
-        sys.exit(1)
+    try:
+        # Ruta absoluta resuelta una sola vez (y comprobación de existencia)
+        zip_path = Path(args.archivo).resolve(strict=True)
+    except OSError:
+        logger.error(f"File not found: {args.archivo}")
+        sys.exit(ExitCode.VALIDATION)
 
     if not zip_path.suffix.lower() == '.zip':
         logger.error("File must be .zip format")
-        sys.exit(1)
+        sys.exit(ExitCode.VALIDATION)
 
-    target_langs = [lang.strip() for lang in args.idioma.split(',')]
-    source_lang = args.origen
     output_dir = Path(args.salida) if args.salida else Path('.')
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    return zip_path, target_langs, source_lang, output_dir
+    return zip_path, output_dir
+
+
+def _lang_list(value: str) -> list[str]:
+    """Tipo argparse: idiomas separados por comas, canónicos y sin duplicados (en orden)."""
+    langs = [_canonical_lang(lang.strip()) for lang in value.split(',') if lang.strip()]
+    if not langs:
+        raise argparse.ArgumentTypeError("indica al menos un idioma")
+    return list(dict.fromkeys(langs))
+
+
+def _canonical_lang(code: str) -> str:
+    """Normalizar mayúsculas de un código de idioma (EN -> en, pt-br -> pt-BR)."""
+    match = _RE_LANG_CODE.fullmatch(code)
+    if match is None:
+        raise argparse.ArgumentTypeError(f"código de idioma no válido: '{code}'")
+    lang, subtag = match.groups()
+    if subtag is None:
+        return lang.lower()
+    # Región en mayúsculas (BR, CN); escritura con inicial mayúscula (Mtei, Hant)
+    return f"{lang.lower()}-{subtag.upper() if len(subtag) == 2 else subtag.title()}"
+
+
+def _cpu_set(value: str) -> set[int]:
+    """Tipo argparse: lista de CPUs separadas por comas (ej: 0,2,3)."""
+    try:
+        cpus = {int(cpu) for cpu in value.split(',')}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' no es una lista de CPUs")
+    if min(cpus) < 0:
+        raise argparse.ArgumentTypeError(f"CPU no válida: {value}")
+    return cpus
+
+
+def _available_cpus() -> int:
+    """CPUs que puede usar el proceso (respeta la afinidad: --cpu-affinity, taskset, cgroups)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _apply_cpu_limits(cpu_affinity: Optional[set[int]], nice: Optional[int]) -> None:
+    """Restringir CPUs y bajar la prioridad antes de crear pools (los hijos lo heredan).
+
+    Raises:
+        OSError: Si la afinidad indicada no es válida en esta máquina.
+    """
+    if cpu_affinity:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cpu_affinity)
+        else:
+            logger.warning("CPU affinity not supported on this platform")
+    if nice is not None:
+        if hasattr(os, 'nice'):
+            os.nice(nice)
+        else:
+            logger.warning("Process priority (nice) not supported on this platform")
+
+
+def _positive_int(value: str) -> int:
+    """Tipo argparse: entero mayor que cero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' no es un entero")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser mayor que 0: {value}")
+    return number
 
 
 async def _run_translation(
@@ -818,31 +1671,74 @@ async def _run_translation(
     target_langs: list[str],
     source_lang: str,
     output_dir: Path,
-    temp_dir: Path
-) -> None:
-    """Orquestar el proceso de traducción."""
-    package, extraction = await _parse_and_extract(zip_path, temp_dir)
+    temp_dir: Path,
+    translator: Translator,
+    rebuild_pool: ProcessPoolExecutor,
+    max_concurrency: int = MAX_PARALLEL_LANGUAGES,
+    max_zip_size: int = MAX_UNCOMPRESSED_SIZE,
+    on_language_done: Optional[Callable[[str], None]] = None
+) -> bool:
+    """Orquestar el proceso de traducción (hasta `max_concurrency` idiomas a la vez).
+
+    El `Translator` lo crea y cierra quien llama: en modo batch se comparte
+    entre paquetes (caché y límite de peticiones comunes). `on_language_done`
+    se invoca con cada idioma cuyo ZIP traducido ya está escrito sin
+    segmentos fallidos.
+
+    Returns:
+        True si todos los idiomas quedaron traducidos por completo
+    """
+    translator.warm_up()
+    package, extraction = await _parse_and_extract(zip_path, temp_dir, max_zip_size)
 
     if not extraction.segments:
         logger.warning("No translatable content found")
-        return
+        return True
 
-    translator, rebuilder = _initialize_processors()
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    for target_lang in target_langs:
-        await _process_single_language(
+    # Un pipeline por idioma: la traducción (red) de uno se solapa con la
+    # reconstrucción (CPU, en un proceso propio para esquivar el GIL) de otro.
+    # Se espera a todos aunque uno falle: una reconstrucción en curso en el
+    # pool seguiría leyendo `temp_dir` mientras quien llama lo borra.
+    results = await asyncio.gather(*(
+        _process_single_language(
             target_lang, source_lang, package, extraction,
-            translator, rebuilder, output_dir
+            translator, rebuild_pool, output_dir, semaphore, on_language_done
         )
+        for target_lang in target_langs
+    ), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
 
     _log_translation_summary(translator, target_langs)
+    return all(results)
+
 
+def _create_rebuild_pool(target_langs: list[str]) -> ProcessPoolExecutor:
+    """Pool de reconstrucción: un proceso por idioma, como máximo uno por CPU.
 
-async def _parse_and_extract(zip_path: Path, temp_dir: Path) -> tuple[ScormPackage, ExtractionResult]:
+    Se crea una vez por ejecución (y no por paquete) para no relanzar los
+    procesos en cada ZIP del modo batch.
+    """
+    return ProcessPoolExecutor(
+        max_workers=min(len(target_langs), _available_cpus()),
+        initializer=_use_direct_logging
+    )
+
+
+async def _parse_and_extract(
+    zip_path: Path,
+    temp_dir: Path,
+    max_zip_size: int = MAX_UNCOMPRESSED_SIZE
+) -> tuple[ScormPackage, ExtractionResult]:
     """Parsear ZIP y extraer contenido traducible."""
     logger.info("Starting SCORM parsing", extra={"file": str(zip_path)})
-    scorm_parser = ScormParser(temp_dir)
-    package = scorm_parser.parse(zip_path)
+    scorm_parser = ScormParser(temp_dir, max_zip_size)
+    # Descompresión y escritura a disco en un hilo: el event loop sigue
+    # atendiendo las traducciones de otros paquetes (modo batch)
+    package = await asyncio.to_thread(scorm_parser.parse, zip_path)
     logger.info("SCORM parsed", extra={
         "version": package.version,
         "html_files": len(package.html_files),
@@ -851,7 +1747,8 @@ async def _parse_and_extract(zip_path: Path, temp_dir: Path) -> tuple[ScormPacka
 
     logger.info("Starting content extraction")
     extractor = ContentExtractor()
-    extraction = extractor.extract(package)
+    # Parseo de manifest y HTML (libxml2) fuera del event loop, como la descompresión
+    extraction = await asyncio.to_thread(extractor.extract, package)
     logger.info("Content extracted", extra={
         "segments": len(extraction.segments),
         "files": len(extraction.files)
@@ -860,9 +1757,23 @@ async def _parse_and_extract(zip_path: Path, temp_dir: Path) -> tuple[ScormPacka
     return package, extraction
 
 
-def _initialize_processors() -> tuple[Translator, ScormRebuilder]:
-    """Inicializar procesadores de traducción y reconstrucción."""
-    return Translator(), ScormRebuilder()
+def _initialize_processors(max_concurrency: int, tm_path: Optional[str] = None) -> Translator:
+    """Inicializar el procesador de traducción.
+
+    La reconstrucción se instancia en cada proceso del pool (`_rebuild_one`).
+    """
+    return Translator(max_parallel_languages=max_concurrency, memory=_open_translation_memory(tm_path))
+
+
+def _open_translation_memory(tm_path: Optional[str]) -> Optional[TranslationMemory]:
+    """Abrir la memoria de traducción; sin ella (ruta vacía o error) se traduce igual."""
+    if not tm_path:
+        return None
+    try:
+        return TranslationMemory(Path(tm_path).expanduser())
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Translation memory disabled: {e}", extra={"path": tm_path})
+        return None
 
 
 async def _process_single_language(
@@ -871,15 +1782,39 @@ async def _process_single_language(
     package: ScormPackage,
     extraction: ExtractionResult,
     translator: Translator,
-    rebuilder: ScormRebuilder,
-    output_dir: Path
-) -> None:
-    """Procesar traducción y reconstrucción para un idioma."""
+    rebuild_pool: ProcessPoolExecutor,
+    output_dir: Path,
+    semaphore: asyncio.Semaphore,
+    on_language_done: Optional[Callable[[str], None]] = None
+) -> bool:
+    """Procesar traducción y reconstrucción para un idioma.
+
+    Retorna False si quedaron segmentos sin traducir: el ZIP se escribe
+    igualmente, pero el idioma no se da por terminado.
+    """
+    async with semaphore:
+        translations, failed = await _translate_language(translator, extraction, source_lang, target_lang)
+        await _rebuild_language(rebuild_pool, package, extraction, translations, output_dir, target_lang)
+    if failed:
+        logger.warning("Language incomplete", extra={"lang": target_lang, "failed_segments": failed})
+        return False
+    if on_language_done:
+        on_language_done(target_lang)
+    return True
+
+
+async def _translate_language(
+    translator: Translator,
+    extraction: ExtractionResult,
+    source_lang: str,
+    target_lang: str
+) -> Tuple[Dict[str, str], int]:
+    """Traducir todos los segmentos a un idioma; retorna también los segmentos fallidos."""
     logger.info("Starting translation", extra={
         "source": source_lang,
         "target": target_lang
     })
-    translations = await translator.translate(
+    translations, failed = await translator.translate(
         extraction.segments,
         source_lang,
         target_lang
@@ -887,12 +1822,25 @@ async def _process_single_language(
     logger.info("Translation completed", extra={
         "target": target_lang,
         "segments": len(translations),
+        "failed_segments": failed,
         "chars": translator.chars_translated
     })
+    return translations, failed
+
 
+async def _rebuild_language(
+    rebuild_pool: ProcessPoolExecutor,
+    package: ScormPackage,
+    extraction: ExtractionResult,
+    translations: Dict[str, str],
+    output_dir: Path,
+    target_lang: str
+) -> None:
+    """Reconstruir el paquete de un idioma en el pool de procesos."""
     logger.info("Rebuilding SCORM package", extra={"lang": target_lang})
-    output_path = rebuilder.rebuild(
-        package, extraction, translations, output_dir, target_lang
+    loop = asyncio.get_running_loop()
+    output_path = await loop.run_in_executor(
+        rebuild_pool, _rebuild_one, package, extraction, translations, output_dir, target_lang
     )
     logger.info("Package built", extra={
         "lang": target_lang,
@@ -900,10 +1848,22 @@ async def _process_single_language(
     })
 
 
+def _rebuild_one(
+    package: ScormPackage,
+    extraction: ExtractionResult,
+    translations: Dict[str, str],
+    output_dir: Path,
+    target_lang: str
+) -> Path:
+    """Reconstruir un idioma dentro de un proceso del pool (función de módulo, serializable)."""
+    return ScormRebuilder().rebuild(package, extraction, translations, output_dir, target_lang)
+
+
 def _log_translation_summary(translator: Translator, target_langs: list[str]) -> None:
     """Registrar resumen final de traducción."""
     logger.info("Translation pipeline completed successfully", extra={
         "chars_total": translator.chars_translated,
+        "memory_hits": translator.memory_hits,
         "langs": len(target_langs)
     })
 
@@ -912,6 +1872,86 @@ def _log_translation_summary(translator: Translator, target_langs: list[str]) ->
 # FLUJO BATCH: pendientes → traducidos + procesados
 # ============================================================================
 
+def _pick_tmp_root(zip_path: Path, override: Optional[str] = None, jobs: int = 1) -> Optional[str]:
+    """Elegir dónde crear el directorio temporal de extracción.
+
+    Prioridad: `--tmp-root`, variable `SCORM_TMPDIR` y, en Linux, `/dev/shm`
+    (tmpfs en RAM) si su espacio libre cubre la extracción de este paquete
+    por cada uno de los `jobs` paquetes que se extraen a la vez (el tmpfs es
+    compartido). None deja que `tempfile` use su directorio por defecto.
+    """
+    root = override or os.environ.get('SCORM_TMPDIR')
+    if root:
+        return root
+    try:
+        if shutil.disk_usage(SHM_DIR).free > jobs * ScormParser.extracted_size(zip_path):
+            return SHM_DIR
+    except (OSError, zipfile.BadZipFile):
+        pass  # Sin /dev/shm (no Linux) o ZIP ilegible: directorio por defecto
+    return None
+
+
+def _make_temp_dir(zip_path: Path, tmp_root: Optional[str], jobs: int = 1) -> Path:
+    """Crear el directorio temporal de un paquete (se borra con `_schedule_cleanup`).
+
+    Es un `job_N` dentro del arena del proceso: en batch no se crea un
+    directorio aleatorio en la raíz temporal por cada ZIP.
+    """
+    temp_dir = _scratch_arena(_pick_tmp_root(zip_path, tmp_root, jobs)) / f"job_{next(_JOB_IDS)}"
+    temp_dir.mkdir()
+    return temp_dir
+
+
+def _scratch_arena(tmp_root: Optional[str]) -> Path:
+    """Arena del proceso en `tmp_root`: se crea en el primer uso y se borra al salir.
+
+    `atexit` se ejecuta después de que terminen los hilos de `_CLEANUP_POOL`,
+    así que los borrados de cada paquete han acabado antes del del arena.
+    """
+    with _SCRATCH_ARENAS_LOCK:
+        arena = _SCRATCH_ARENAS.get(tmp_root)
+        if arena is None:
+            arena = _SCRATCH_ARENAS[tmp_root] = Path(tempfile.mkdtemp(prefix='scorm_arena_', dir=tmp_root))
+            atexit.register(_remove_temp_dir, arena)
+        return arena
+
+
+def _schedule_cleanup(path: Path) -> None:
+    """Programar el borrado de un directorio temporal en segundo plano."""
+    _CLEANUP_POOL.submit(_remove_temp_dir, path)
+
+
+def _remove_temp_dir(path: Path) -> None:
+    """Borrar un directorio temporal; un fallo solo se registra (como `ignore_errors`)."""
+    try:
+        _fast_rmtree(str(path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove temp dir: {e}", extra={"path": str(path)})
+
+
+def _fast_rmtree(root: str) -> None:
+    """Borrar un árbol con `os.scandir`: el tipo sale del dirent, sin `stat` por entrada.
+
+    Pila explícita (sin recursión) y directorios borrados en orden inverso
+    al de descubrimiento, de modo que los hijos se eliminan antes que el padre.
+    """
+    dirs = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        dirs.append(path)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+    for path in reversed(dirs):
+        os.rmdir(path)
+
+
 def _ensure_workflow_dirs() -> None:
     """Crear directorios de flujo batch si no existen."""
     PENDING_DIR.mkdir(exist_ok=True)
@@ -933,37 +1973,162 @@ def _move_to_processed(zip_path: Path) -> None:
     logger.info("Moved to processed", extra={"file": zip_path.name})
 
 
-async def _run_batch(target_langs: List[str], source_lang: str) -> None:
-    """Ejecutar traducción en modo batch para todos los archivos en pendientes/."""
+async def _run_batch(
+    translator: Translator,
+    target_langs: List[str],
+    source_lang: str,
+    max_concurrency: int,
+    workers: int,
+    tmp_root: Optional[str] = None,
+    max_zip_size: int = MAX_UNCOMPRESSED_SIZE
+) -> ExitCode:
+    """Ejecutar traducción en modo batch para todos los archivos en pendientes/.
+
+    `workers` tareas consumen una cola con los ZIP pendientes; comparten el
+    `Translator` (lo crea y cierra `main`) y el pool de reconstrucción.
+    Retorna el código del primer paquete fallido (el resto se procesa
+    igualmente).
+    """
     _ensure_workflow_dirs()
     pending_files = _find_pending_files()
 
     if not pending_files:
         logger.warning("No pending files found in pendientes/")
-        return
+        return ExitCode.OK
 
-    logger.info("Batch mode started", extra={"files": len(pending_files)})
+    logger.info("Batch mode started", extra={"files": len(pending_files), "workers": workers})
 
+    job_queue: asyncio.Queue[Path] = asyncio.Queue()
     for zip_path in pending_files:
-        temp_dir = Path(tempfile.mkdtemp())
+        job_queue.put_nowait(zip_path)
+
+    jobs = min(workers, len(pending_files))
+    with _create_rebuild_pool(target_langs) as rebuild_pool:
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(_batch_worker(
+                    job_queue, target_langs, source_lang, translator, rebuild_pool,
+                    max_concurrency, tmp_root, max_zip_size, jobs
+                ))
+                for _ in range(jobs)
+            ]
+
+    logger.info("Batch mode completed")
+    failures = [task.result() for task in tasks if task.result()]
+    return _final_exit_code(translator, failures[0] if failures else ExitCode.OK)
+
+
+async def _batch_worker(
+    job_queue: asyncio.Queue,
+    target_langs: List[str],
+    source_lang: str,
+    translator: Translator,
+    rebuild_pool: ProcessPoolExecutor,
+    max_concurrency: int,
+    tmp_root: Optional[str],
+    max_zip_size: int,
+    jobs: int
+) -> ExitCode:
+    """Procesar ZIPs de la cola hasta vaciarla (la cola se llena antes de arrancar).
+
+    `jobs` es el número de workers que extraen a la vez (ver `_pick_tmp_root`).
+    Retorna el código del primer paquete que falle en este worker.
+    """
+    code = ExitCode.OK
+    while not job_queue.empty():
+        zip_path = job_queue.get_nowait()
+        temp_dir = None
         try:
             logger.info("Processing file", extra={"file": zip_path.name})
-            await _run_translation(zip_path, target_langs, source_lang, TRANSLATED_DIR, temp_dir)
-            _move_to_processed(zip_path)
-        except Exception as e:
+            # Lee el directorio central del ZIP (ver `_pick_tmp_root`): fuera del event loop
+            temp_dir = await asyncio.to_thread(_make_temp_dir, zip_path, tmp_root, jobs)
+            identity = _source_identity(zip_path)
+            langs = _pending_langs(zip_path, identity, target_langs)
+            complete = not langs or await _run_translation(
+                zip_path, langs, source_lang, TRANSLATED_DIR, temp_dir,
+                translator, rebuild_pool, max_concurrency, max_zip_size,
+                functools.partial(_mark_lang_done, zip_path, identity)
+            )
+            if complete:
+                _move_to_processed(zip_path)
+                _clear_batch_state(zip_path)
+            else:
+                # Se queda en pendientes/: el reintento rehace solo los idiomas incompletos
+                logger.warning("Leaving incomplete package in pendientes/", extra={"file": zip_path.name})
+        except PACKAGE_ERRORS as e:
             logger.error(f"Failed to process {zip_path.name}: {e}", exc_info=True)
+            code = code or _exit_code_for(e)
         finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            if temp_dir is not None:
+                _schedule_cleanup(temp_dir)
+    return code
+
+
+def _pending_langs(zip_path: Path, identity: Dict[str, int], target_langs: List[str]) -> List[str]:
+    """Idiomas de un ZIP sin salida terminada (reanudación tras un fallo o Ctrl+C).
+
+    Solo se omiten los idiomas anotados en `BATCH_STATE_FILE` para este mismo
+    original (nombre, tamaño y mtime) cuyo ZIP traducido sigue existiendo.
+    """
+    entry = _load_batch_state().get(zip_path.name, {})
+    done = set(entry.get("langs", [])) if entry.get("source") == identity else set()
+    pending = []
+    for lang in target_langs:
+        if lang in done and ScormRebuilder.output_path(TRANSLATED_DIR, zip_path, lang).exists():
+            logger.info("Skipping completed language", extra={"file": zip_path.name, "lang": lang})
+        else:
+            pending.append(lang)
+    return pending
 
-    logger.info("Batch mode completed")
+
+def _source_identity(zip_path: Path) -> Dict[str, int]:
+    """Identidad del original para el estado batch (tamaño y mtime en ns)."""
+    st = zip_path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _load_batch_state() -> Dict[str, Any]:
+    """Leer `BATCH_STATE_FILE`; si falta o está corrupto se parte de cero."""
+    try:
+        return orjson.loads(BATCH_STATE_FILE.read_bytes())
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable batch state: {e}", extra={"path": str(BATCH_STATE_FILE)})
+        return {}
+
+
+def _save_batch_state(state: Dict[str, Any]) -> None:
+    """Escribir `BATCH_STATE_FILE` de forma atómica (`.part` + `os.replace`)."""
+    partial = BATCH_STATE_FILE.with_name(BATCH_STATE_FILE.name + ".part")
+    partial.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    os.replace(partial, BATCH_STATE_FILE)
+
+
+def _mark_lang_done(zip_path: Path, identity: Dict[str, int], lang: str) -> None:
+    """Anotar un idioma reconstruido (se llama en el event loop: sin carreras entre workers)."""
+    state = _load_batch_state()
+    entry = state.get(zip_path.name)
+    if not entry or entry.get("source") != identity:
+        entry = state[zip_path.name] = {"source": identity, "langs": []}
+    if lang not in entry["langs"]:
+        entry["langs"].append(lang)
+    _save_batch_state(state)
+
+
+def _clear_batch_state(zip_path: Path) -> None:
+    """Olvidar un paquete ya movido a procesados/."""
+    state = _load_batch_state()
+    if state.pop(zip_path.name, None) is not None:
+        _save_batch_state(state)
 
 
 # ============================================================================
 # CLI PRINCIPAL
 # ============================================================================
 
-async def main():
-    """CLI principal del Traductor SCORM."""
+async def main() -> ExitCode:
+    """CLI principal del Traductor SCORM; retorna el código de salida."""
     parser = argparse.ArgumentParser(
         description='Traduce paquetes SCORM a múltiples idiomas.',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -977,29 +2142,79 @@ Ejemplos:
 
     parser.add_argument('archivo', nargs='?', default=None,
                         help='Archivo SCORM (.zip). Si se omite, procesa pendientes/')
-    parser.add_argument('--idioma', '-i', required=True,
+    parser.add_argument('--idioma', '-i', required=True, type=_lang_list,
                         help='Idioma(s) destino (ej: ca, en,fr,de)')
     parser.add_argument('--origen', '-o', default='es',
                         help='Idioma origen (default: es)')
     parser.add_argument('--salida', '-s', default=None,
                         help='Carpeta de salida (default: traducidos/ en batch, . en archivo único)')
+    parser.add_argument('--max-concurrency', type=_positive_int, default=None,
+                        help=f'Idiomas traducidos en paralelo (default: min({MAX_PARALLEL_LANGUAGES}, nº de idiomas))')
+    parser.add_argument('--workers', type=_positive_int, default=None,
+                        help='Paquetes procesados en paralelo en modo batch (default: nº de CPUs disponibles)')
+    parser.add_argument('--tmp-root', default=None,
+                        help='Directorio para la extracción temporal (default: $SCORM_TMPDIR, /dev/shm o el del sistema)')
+    parser.add_argument('--max-zip-size', type=_positive_int, default=MAX_UNCOMPRESSED_SIZE // 1024 ** 2,
+                        metavar='MB',
+                        help='Tamaño descomprimido máximo del paquete en MB (default: %(default)s)')
+    parser.add_argument('--tm-cache', default=str(DEFAULT_TM_PATH), metavar='RUTA',
+                        help='Memoria de traducción SQLite entre ejecuciones ("" para desactivarla) '
+                             '(default: %(default)s)')
+    parser.add_argument('--cpu-affinity', type=_cpu_set, default=None, metavar='CPUS',
+                        help='Limitar el proceso a estas CPUs (ej: 0,1,2; solo Linux)')
+    parser.add_argument('--nice', type=_positive_int, default=None, metavar='N',
+                        help='Bajar la prioridad del proceso N puntos (ej: 10)')
 
     args = parser.parse_args()
-    target_langs = [lang.strip() for lang in args.idioma.split(',')]
+    try:
+        _apply_cpu_limits(args.cpu_affinity, args.nice)
+    except OSError as e:
+        logger.error(f"Invalid CPU limits: {e}")
+        return ExitCode.VALIDATION
+    target_langs = args.idioma
     source_lang = args.origen
+    max_concurrency = args.max_concurrency or min(MAX_PARALLEL_LANGUAGES, len(target_langs))
+    max_zip_size = args.max_zip_size * 1024 ** 2
+    workers = args.workers or _available_cpus()
+    batch_mode = args.archivo is None
+    # Rutas validadas antes de crear el Translator: un error de uso no abre
+    # (ni crea) la memoria de traducción ni arranca hilos
+    paths = None if batch_mode else _validate_args(args)
+
+    # Un único Translator por ejecución, compartido por ambos modos: caché,
+    # memoria de traducción, límite de peticiones y clientes HTTP compartidos
+    translator = _initialize_processors(max_concurrency * (workers if batch_mode else 1), args.tm_cache)
+    try:
+        # Modo batch: sin archivo, procesa pendientes/
+        if batch_mode:
+            logger.info("Starting batch mode", extra={
+                "source_lang": source_lang,
+                "target_langs": target_langs
+            })
+            return await _run_batch(
+                translator, target_langs, source_lang, max_concurrency, workers,
+                args.tmp_root, max_zip_size
+            )
+        zip_path, output_dir = paths
+        return await _run_single_file(
+            zip_path, output_dir, args.tmp_root, translator, target_langs, source_lang,
+            max_concurrency, max_zip_size
+        )
+    finally:
+        translator.close()
 
-    # Modo batch: sin archivo, procesa pendientes/
-    if args.archivo is None:
-        logger.info("Starting batch mode", extra={
-            "source_lang": source_lang,
-            "target_langs": target_langs
-        })
-        await _run_batch(target_langs, source_lang)
-        return
-
-    # Modo archivo único
-    zip_path, target_langs, source_lang, output_dir = _validate_args(args)
 
+async def _run_single_file(
+    zip_path: Path,
+    output_dir: Path,
+    tmp_root: Optional[str],
+    translator: Translator,
+    target_langs: List[str],
+    source_lang: str,
+    max_concurrency: int,
+    max_zip_size: int
+) -> ExitCode:
+    """Modo archivo único: traducir el ZIP indicado (ya validado por `_validate_args`)."""
     logger.info("Starting SCORM Translator CLI", extra={
         "file": str(zip_path),
         "source_lang": source_lang,
@@ -1007,16 +2222,32 @@ Ejemplos:
         "output_dir": str(output_dir)
     })
 
-    temp_dir = Path(tempfile.mkdtemp())
-
+    temp_dir = None
     try:
-        await _run_translation(zip_path, target_langs, source_lang, output_dir, temp_dir)
-    except Exception as e:
+        temp_dir = await asyncio.to_thread(_make_temp_dir, zip_path, tmp_root)
+        with _create_rebuild_pool(target_langs) as rebuild_pool:
+            await _run_translation(
+                zip_path, target_langs, source_lang, output_dir, temp_dir,
+                translator, rebuild_pool, max_concurrency, max_zip_size
+            )
+    except PACKAGE_ERRORS as e:
         logger.error(f"Translation failed: {e}", exc_info=True)
-        sys.exit(1)
+        return _exit_code_for(e)
     finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        if temp_dir is not None:
+            _schedule_cleanup(temp_dir)
+    return _final_exit_code(translator)
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    exit_code = ExitCode.OK
+    try:
+        with _queued_logging(), asyncio.Runner(loop_factory=uvloop.new_event_loop if uvloop else None) as runner:
+            exit_code = runner.run(main())
+    except KeyboardInterrupt:
+        # main() ya se canceló: sus `finally` han programado el borrado de temporales
+        exit_code = ExitCode.INTERRUPTED
+    finally:
+        # Garantizar que los borrados pendientes terminan antes de salir
+        _CLEANUP_POOL.shutdown(wait=True)
+    sys.exit(exit_code)